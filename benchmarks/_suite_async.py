@@ -0,0 +1,96 @@
+import timeit
+from asyncio import gather, new_event_loop
+
+from cachel.base import AsyncBaseCache
+from cachel.simple import make_cache
+
+
+def async_benchmarks(benchmark, DictCache, user, users, ids):
+    class AsyncDictCache(AsyncBaseCache):
+        def __init__(self):
+            self.cache = {}
+
+        async def set(self, key, value, ttl):
+            self.cache[key] = value
+
+        async def get(self, key):
+            return self.cache.get(key)
+
+        async def mget(self, keys):
+            get = self.cache.get
+            return [get(k) for k in keys]
+
+        async def delete(self, key):
+            self.cache.pop(key, None)
+
+    async def async_user(uid):
+        return user(uid)
+
+    @benchmark('async.wrapper.hit')
+    def _():
+        f = make_cache(AsyncDictCache(), fuzzy_ttl=False)('user:{}')(async_user)
+        f.cache.cache['user:1'] = f.dumps(user(1))
+
+        async def op():
+            return await f(1)
+        return op
+
+    @benchmark('async.wrapper.miss')
+    def _():
+        f = make_cache(AsyncDictCache(), fuzzy_ttl=False)('user:{}')(async_user)
+        cache = f.cache.cache
+
+        async def op():
+            cache.clear()
+            return await f(1)
+        return op
+
+    @benchmark('async.objects.hit.100', 1000)
+    def _():
+        f = make_cache(AsyncDictCache(), fuzzy_ttl=False).objects('user:{}')(users)
+        cache = f.cache.cache
+        cache.update(('user:{}'.format(it), f.dumps(user(it))) for it in ids)
+
+        async def op():
+            return await f(ids)
+        return op
+
+    @benchmark('async.objects.miss.100', 1000)
+    def _():
+        f = make_cache(AsyncDictCache(), fuzzy_ttl=False).objects('user:{}')(users)
+        cache = f.cache.cache
+
+        async def op():
+            cache.clear()
+            return await f(ids)
+        return op
+
+    def one_x100(auto_batch):
+        async def async_users(ids):
+            return users(ids)
+
+        f = make_cache(AsyncDictCache(), fuzzy_ttl=False).objects(
+            'user:{}', auto_batch=auto_batch)(async_users)
+        cache = f.cache.cache
+
+        async def op():
+            cache.clear()
+            return await gather(*[f.one(it) for it in ids])
+        return op
+
+    benchmark('async.objects.one.miss.x100', 100)(lambda: one_x100(False))
+    benchmark('async.objects.one.miss.x100.auto_batch', 100)(lambda: one_x100(True))
+
+
+def async_measure(func, number, repeat):
+    loop = new_event_loop()
+
+    async def run():
+        for _ in range(number):
+            await func()
+
+    timer = lambda: loop.run_until_complete(run())
+    try:
+        return min(timeit.repeat(timer, number=1, repeat=repeat)) / number
+    finally:
+        loop.close()
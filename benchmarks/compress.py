@@ -0,0 +1,42 @@
+"""Size vs CPU tradeoff of compressed serializers.
+
+Usage: python benchmarks/compress.py
+"""
+import sys
+import timeit
+sys.path.insert(0, '.')
+
+from cachel.base import get_serializer, SERIALIZERS
+from cachel.compress import zlib_serializer
+
+FORMATS = ['msgpack', 'msgpack+zlib', 'json', 'json+zlib']
+
+
+def make_payload(size):
+    return [{'id': it, 'name': 'user-{}'.format(it), 'email': 'user-{}@example.com'.format(it),
+             'active': it % 2 == 0, 'score': it * 1.5} for it in range(size)]
+
+
+def bench(name, serializer, value, number=200):
+    dumps, loads = serializer
+    data = dumps(value)
+    tdumps = min(timeit.repeat(lambda: dumps(value), number=number, repeat=3)) / number
+    tloads = min(timeit.repeat(lambda: loads(data), number=number, repeat=3)) / number
+    print('{:<24} {:>10} {:>12.1f} {:>12.1f}'.format(
+        name, len(data), tdumps * 1e6, tloads * 1e6))
+
+
+def main():
+    zdict = SERIALIZERS['msgpack'][0](make_payload(5))
+    print('{:<24} {:>10} {:>12} {:>12}'.format('format', 'bytes', 'dumps, us', 'loads, us'))
+    for size in (1, 10, 100, 1000):
+        value = make_payload(size)
+        print('payload: {} records'.format(size))
+        for fmt in FORMATS:
+            bench(fmt, get_serializer(fmt), value)
+        bench('msgpack+zlib(zdict)',
+              zlib_serializer(SERIALIZERS['msgpack'], threshold=0, zdict=zdict), value)
+
+
+if __name__ == '__main__':
+    main()
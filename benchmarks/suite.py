@@ -0,0 +1,461 @@
+"""Hot path benchmark suite.
+
+Usage:
+    python benchmarks/suite.py [-k filter] [-o results.json] [-c baseline.json]
+
+Results are per operation timings in microseconds (best of several
+repeats). Save them with -o and compare another run against them with -c.
+"""
+import os
+import sys
+import json
+import time
+import timeit
+import argparse
+import platform
+import subprocess
+from threading import Lock
+from concurrent.futures import ThreadPoolExecutor
+sys.path.insert(0, '.')
+
+from cachel import compat, ast_transformer
+from cachel.base import (BaseCache, SERIALIZERS, get_serializer, get_loads_many,
+                         make_key_func)
+from cachel.batching import BatchingCache
+from cachel.envelope import pack
+from cachel.memory import MemoryCache
+from cachel.offload import make_offload_cache
+from cachel.sharded import ShardedCache
+from cachel.simple import make_cache
+from cachel.tiered import TieredCache
+
+BENCHMARKS = []
+
+
+def benchmark(name, number=10000):
+    def decorator(setup):
+        BENCHMARKS.append((name, setup, number))
+        return setup
+    return decorator
+
+
+class DictCache(BaseCache):
+    def __init__(self):
+        self.cache = {}
+
+    def set(self, key, value, ttl):
+        self.cache[key] = value
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def mget(self, keys):
+        get = self.cache.get
+        return [get(k) for k in keys]
+
+    def delete(self, key):
+        self.cache.pop(key, None)
+
+
+def user(uid):
+    return {'id': uid, 'name': 'user-{}'.format(uid), 'active': True}
+
+
+def users(ids):
+    return {it: user(it) for it in ids}
+
+
+def payload(size):
+    return [user(it) for it in range(size)]
+
+
+IDS = list(range(100))
+KEYS = ['user:{}'.format(it) for it in range(100)]
+
+
+@benchmark('keyfunc.single')
+def _():
+    f = make_key_func('user:{}:{lang}', lambda user_id, lang='en': None)
+    return lambda: f(10, 'ru')
+
+
+@benchmark('keyfunc.multi.100', 2000)
+def _():
+    f = make_key_func('user:{id}:{lang}', lambda ids, lang='en': None, True)
+    return lambda: f(IDS, 'ru')
+
+
+class User(object):
+    id = 10
+
+
+@benchmark('keyfunc.single.path')
+def _():
+    f = make_key_func('user:{user.id}:{filters[lang]}', lambda user, filters: None)
+    user, filters = User(), {'lang': 'ru'}
+    return lambda: f(user, filters)
+
+
+@benchmark('keyfunc.single.path.handwritten')
+def _():
+    f = lambda user, filters: 'user:{}:{}'.format(user.id, filters['lang'])
+    user, filters = User(), {'lang': 'ru'}
+    return lambda: f(user, filters)
+
+
+@benchmark('keyfunc.single.spec')
+def _():
+    f = make_key_func('user:{}:{lang}', lambda *args, **kwargs: None,
+                      spec='user_id, lang="en", **kwargs')
+    return lambda: f(10, lang='ru', timeout=1)
+
+
+@benchmark('keyfunc.single.spec.handwritten')
+def _():
+    f = lambda *args, **kwargs: 'user:{}:{}'.format(args[0], kwargs.get('lang', 'en'))
+    return lambda: f(10, lang='ru', timeout=1)
+
+
+@benchmark('keyfunc.single.max_size')
+def _():
+    f = make_key_func('user:{}:{lang}', lambda user_id, lang='en': None, max_size=64)
+    return lambda: f(10, 'ru')
+
+
+@benchmark('keyfunc.multi.100.max_size', 2000)
+def _():
+    f = make_key_func('user:{id}:{lang}', lambda ids, lang='en': None, True, 64)
+    return lambda: f(IDS, 'ru')
+
+
+@benchmark('keyfunc.multi.100.digest', 2000)
+def _():
+    f = make_key_func('user:{id}:{lang}', lambda ids, lang='en': None, True, 64)
+    lang = 'x' * 100
+    return lambda: f(IDS, lang)
+
+
+def cached_user(fmt='msgpack', **kwargs):
+    cache = make_cache(DictCache(), fmt=fmt, fuzzy_ttl=False, **kwargs)
+    return cache('user:{}')(user)
+
+
+@benchmark('wrapper.hit')
+def _():
+    f = cached_user()
+    f(1)
+    return lambda: f(1)
+
+
+@benchmark('wrapper.miss')
+def _():
+    f = cached_user()
+    delete = f.cache.delete
+    return lambda: (delete('user:1'), f(1))
+
+
+@benchmark('wrapper.hit.stale_ttl')
+def _():
+    f = cached_user(stale_ttl=60)
+    f(1)
+    return lambda: f(1)
+
+
+@benchmark('wrapper.stale.stale_ttl')
+def _():
+    f = cached_user(stale_ttl=60, offload=lambda *args, **kwargs: None)
+    f.cache.set('user:1', pack(f.dumps(user(1)), 1), 60)
+    return lambda: f(1)
+
+
+@benchmark('wrapper.hit.stats')
+def _():
+    f = cached_user(stats=True)
+    f(1)
+    return lambda: f(1)
+
+
+@benchmark('objects.hit.100', 1000)
+def _():
+    f = make_cache(DictCache(), fuzzy_ttl=False).objects('user:{}')(users)
+    f(IDS)
+    return lambda: f(IDS)
+
+
+@benchmark('objects.hit.5000', 20)
+def _():
+    ids = list(range(5000))
+    f = make_cache(DictCache(), fuzzy_ttl=False).objects('user:{}')(users)
+    f(ids)
+    return lambda: f(ids)
+
+
+@benchmark('objects.hit.5000.chunked', 20)
+def _():
+    ids = list(range(5000))
+    f = make_cache(DictCache(), fuzzy_ttl=False).objects('user:{}', chunk_size=500)(users)
+    f(ids)
+    return lambda: f(ids)
+
+
+@benchmark('objects.miss.100', 1000)
+def _():
+    f = make_cache(DictCache(), fuzzy_ttl=False).objects('user:{}')(users)
+    clear = f.cache.cache.clear
+    return lambda: (clear(), f(IDS))
+
+
+def offload_user():
+    c1, c2 = DictCache(), DictCache()
+    cache = make_offload_cache(c1, c2, fuzzy_ttl=False, offload=lambda *args, **kwargs: None)
+    return c1, c2, cache('user:{}')(user)
+
+
+@benchmark('offload.fresh')
+def _():
+    c1, c2, f = offload_user()
+    f(1)
+    return lambda: f(1)
+
+
+@benchmark('offload.stale')
+def _():
+    c1, c2, f = offload_user()
+    c2.set('user:1', f.dumps2(f.dumps(user(1)), 1), 0)
+    return lambda: (c1.delete('user:1'), f(1))
+
+
+@benchmark('offload.missing')
+def _():
+    c1, c2, f = offload_user()
+    return lambda: (c1.delete('user:1'), c2.delete('user:1'), f(1))
+
+
+@benchmark('offload.objects.stale.100', 1000)
+def _():
+    c1, c2 = DictCache(), DictCache()
+    cache = make_offload_cache(c1, c2, fuzzy_ttl=False, offload=lambda *args, **kwargs: None)
+    f = cache.objects('user:{}')(users)
+    for it in IDS:
+        c2.set('user:{}'.format(it), f.dumps2(f.dumps(user(it)), 1), 0)
+    return lambda: (c1.cache.clear(), f(IDS))
+
+
+def offload_cache2_hits(legacy):
+    ids = list(range(5000))
+    c1, c2 = DictCache(), DictCache()
+    cache = make_offload_cache(c1, c2, fuzzy_ttl=False, offload=lambda *args, **kwargs: None)
+    f = cache.objects('user:{}')(users)
+    expire = time.time() + 3600
+    for it in ids:
+        data = f.dumps(user(it))
+        if legacy:
+            data = str(int(expire)).encode() + b':' + data
+        else:
+            data = f.dumps2(data, expire - f.expire)
+        c2.set('user:{}'.format(it), data, 0)
+    return lambda: (c1.cache.clear(), f(ids))
+
+
+benchmark('offload.objects.cache2.5000', 20)(lambda: offload_cache2_hits(False))
+benchmark('offload.objects.cache2.5000.legacy', 20)(lambda: offload_cache2_hits(True))
+
+
+@benchmark('offload.loads2', 100000)
+def _():
+    c1, c2, f = offload_user()
+    data = f.dumps2(f.dumps(user(1)))
+    return lambda: f.loads2(data)
+
+
+@benchmark('offload.loads2.legacy', 100000)
+def _():
+    c1, c2, f = offload_user()
+    data = b'1700000000:' + f.dumps(user(1))
+    return lambda: f.loads2(data)
+
+
+def serializer_benchmarks():
+    for fmt in sorted(SERIALIZERS) + ['msgpack+zlib', 'json+zlib']:
+        if fmt in ('none', 'unicode'):
+            continue
+        for size in (1, 100, 1000):
+            dumps, loads = get_serializer(fmt)
+            value = payload(size)
+            data = dumps(value)
+            number = max(10, 10000 // size)
+            benchmark('serializer.{}.dumps.{}'.format(fmt, size), number)(
+                lambda dumps=dumps, value=value: lambda: dumps(value))
+            benchmark('serializer.{}.loads.{}'.format(fmt, size), number)(
+                lambda loads=loads, data=data: lambda: loads(data))
+
+        serializer = get_serializer(fmt)
+        values = [serializer[0](user(it)) for it in range(1000)]
+        loads_many = get_loads_many(serializer)
+        benchmark('serializer.{}.loads_many.1000'.format(fmt), 100)(
+            lambda loads_many=loads_many, values=values: lambda: loads_many(values))
+
+
+serializer_benchmarks()
+
+
+def backend_benchmarks():
+    backends = {
+        'memory': MemoryCache,
+        'tiered': lambda: TieredCache(None, DictCache()),
+        'sharded': lambda: ShardedCache([DictCache() for _ in range(4)]),
+    }
+    items = [(k, b'value') for k in KEYS]
+    for name, factory in sorted(backends.items()):
+        def get(factory=factory):
+            c = factory()
+            c.set('key', b'value', 600)
+            return lambda: c.get('key')
+
+        def mget(factory=factory):
+            c = factory()
+            c.mset(items, 600)
+            return lambda: c.mget(KEYS)
+
+        def mset(factory=factory):
+            c = factory()
+            return lambda: c.mset(items, 600)
+
+        benchmark('backend.{}.get'.format(name))(get)
+        benchmark('backend.{}.mget.100'.format(name), 1000)(mget)
+        benchmark('backend.{}.mset.100'.format(name), 1000)(mset)
+
+
+backend_benchmarks()
+
+
+class SlowCache(DictCache):
+    # emulates a saturated server, every command takes 100us
+    # and commands are processed one by one
+    def __init__(self):
+        DictCache.__init__(self)
+        self.lock = Lock()
+
+    def get(self, key):
+        with self.lock:
+            time.sleep(0.0001)
+        return DictCache.get(self, key)
+
+    def mget(self, keys):
+        with self.lock:
+            time.sleep(0.0001)
+        return DictCache.mget(self, keys)
+
+
+def threaded_gets(cache, threads=16, gets=10):
+    executor = ThreadPoolExecutor(threads)
+    cache.set('key', b'value', 600)
+
+    def worker():
+        for _ in range(gets):
+            cache.get('key')
+
+    return lambda: [it.result() for it in [executor.submit(worker) for _ in range(threads)]]
+
+
+benchmark('backend.slow.get.16x10.threads', 10)(lambda: threaded_gets(SlowCache()))
+benchmark('backend.batching.get.16x10.threads', 10)(
+    lambda: threaded_gets(BatchingCache(SlowCache())))
+
+
+def run_python(code):
+    return lambda: subprocess.check_call([sys.executable, '-c', code])
+
+
+FIRST_DECORATION = '''
+from cachel import make_cache, NullCache
+make_cache(NullCache())('user:{}')(lambda user_id: None)
+'''
+
+benchmark('import.python', 10)(lambda: run_python('pass'))
+benchmark('import.cachel', 10)(lambda: run_python('import cachel'))
+benchmark('import.first_decoration', 10)(lambda: run_python(FIRST_DECORATION))
+
+
+@benchmark('wrappers.transform', 20)
+def _():
+    fname = ast_transformer.__file__.replace('ast_transformer', 'wrappers/wrappers_t')
+    fname = os.path.splitext(fname)[0] + '.py'
+    params = dict(fn=False, cache=False, call=False)
+    return lambda: compile(ast_transformer.transform(fname, params), fname, 'exec')
+
+
+@benchmark('wrappers.load_cached', 20)
+def _():
+    fname = ast_transformer.__file__.replace('ast_transformer', 'wrappers/wrappers_t')
+    fname = os.path.splitext(fname)[0] + '.py'
+    params = (('fn', False), ('cache', False), ('call', False))
+    dont_write_bytecode = sys.dont_write_bytecode
+    sys.dont_write_bytecode = False
+    try:
+        ast_transformer.compile_cached(fname, params)
+    finally:
+        sys.dont_write_bytecode = dont_write_bytecode
+    return lambda: ast_transformer.compile_cached(fname, params)
+
+
+if compat.ASYNC_AWAIT:
+    from _suite_async import async_benchmarks
+    async_benchmarks(benchmark, DictCache, user, users, IDS)
+
+
+def measure(setup, number, repeat):
+    func = setup()
+    if compat.iscoroutinefunction(func):
+        from _suite_async import async_measure
+        return async_measure(func, number, repeat)
+
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.STDOUT).decode().strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-k', dest='filter', help='run benchmarks containing this substring')
+    parser.add_argument('-o', dest='output', help='write results as json')
+    parser.add_argument('-c', dest='compare', help='compare with previously saved results')
+    parser.add_argument('-r', dest='repeat', type=int, default=5)
+    parser.add_argument('-s', dest='scale', type=float, default=1.0,
+                        help='scale number of iterations')
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+
+    results = {}
+    for name, setup, number in BENCHMARKS:
+        if args.filter and args.filter not in name:
+            continue
+        number = max(1, int(number * args.scale))
+        value = results[name] = measure(setup, number, args.repeat) * 1e6
+        line = '{:<40} {:>12.3f} us'.format(name, value)
+        if name in baseline:
+            line += ' {:>12.3f} us {:>+8.1f}%'.format(
+                baseline[name], (value / baseline[name] - 1) * 100)
+        print(line)
+        sys.stdout.flush()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'meta': {'python': platform.python_version(),
+                                'implementation': platform.python_implementation(),
+                                'commit': git_commit()},
+                       'results': results}, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -30,6 +30,13 @@ class AsyncBaseCache(object):
         for k, v in items:
             await self.set(k, v, expire)
 
+    async def mset_ttl(self, items):
+        groups = {}
+        for k, v, expire in items:
+            groups.setdefault(expire, []).append((k, v))
+        for expire, group in groups.items():
+            await self.mset(group, expire)
+
     async def mdelete(self, keys):
         for k in keys:
             await self.delete(k)
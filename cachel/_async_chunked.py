@@ -0,0 +1,52 @@
+from .base import AsyncBaseCache
+from .chunked import BaseChunkedCache, chunks, unique_keys, unique_items
+
+
+class AsyncChunkedCache(BaseChunkedCache, AsyncBaseCache):
+    def __init__(self, cache, chunk_size=1000, concurrency=4):
+        BaseChunkedCache.__init__(self, cache, chunk_size)
+        self.concurrency = concurrency
+
+    async def _run(self, func, chunks):
+        from asyncio import Semaphore, gather
+        semaphore = Semaphore(self.concurrency)
+
+        async def call(chunk):
+            async with semaphore:
+                return await func(*chunk)
+
+        return await gather(*[call(it) for it in chunks])
+
+    async def get(self, key):
+        return await self.cache.get(key)
+
+    async def set(self, key, value, ttl):
+        await self.cache.set(key, value, ttl)
+
+    async def delete(self, key):
+        await self.cache.delete(key)
+
+    async def mget(self, keys):
+        if len(keys) <= self.chunk_size:
+            return await self.cache.mget(keys)
+
+        keys, positions = unique_keys(keys)
+        result = []
+        for values in await self._run(self.cache.mget, [
+                (it,) for it in chunks(keys, self.chunk_size)]):
+            result.extend(values)
+        if positions is not None:
+            result = [result[it] for it in positions]
+        return result
+
+    async def mset(self, items, ttl):
+        await self._run(self.cache.mset, [
+            (it, ttl) for it in chunks(unique_items(items), self.chunk_size)])
+
+    async def mset_ttl(self, items):
+        await self._run(self.cache.mset_ttl, [
+            (it,) for it in chunks(unique_items(items), self.chunk_size)])
+
+    async def mdelete(self, keys):
+        await self._run(self.cache.mdelete, [
+            (it,) for it in chunks(unique_keys(keys)[0], self.chunk_size)])
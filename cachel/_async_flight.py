@@ -0,0 +1,53 @@
+class AsyncSingleFlight(object):
+    def __init__(self):
+        # asyncio is imported on first use to keep `import cachel` cheap
+        from asyncio import ensure_future, shield
+        self.ensure_future = ensure_future
+        self.shield = shield
+        self.calls = {}
+
+    def _start(self, keys, coro):
+        calls = self.calls
+        task = self.ensure_future(coro)
+        for key in keys:
+            calls[key] = task
+
+        def done(_):
+            for key in keys:
+                if calls.get(key) is task:
+                    del calls[key]
+
+        task.add_done_callback(done)
+        return task
+
+    async def __call__(self, key, func, *args):
+        task = self.calls.get(key)
+        if task is None:
+            task = self._start([key], func(*args))
+        return await self.shield(task)
+
+    async def multi(self, keys, ids, func, *args):
+        calls = self.calls
+        tasks = {}
+        owned_keys = []
+        owned_ids = set()
+        for key, oid in zip(keys, ids):
+            task = calls.get(key)
+            if task is None:
+                owned_keys.append(key)
+                owned_ids.add(oid)
+            else:
+                tasks.setdefault(task, []).append(oid)
+
+        if owned_keys:
+            task = self._start(owned_keys, func(owned_ids, *args))
+            tasks[task] = owned_ids
+
+        result = {}
+        for task, oids in tasks.items():
+            tresult = await self.shield(task)
+            for oid in oids:
+                if oid in tresult:
+                    result[oid] = tresult[oid]
+
+        return result
@@ -0,0 +1,54 @@
+from .base import call_key
+
+
+class AsyncBatchLoader(object):
+    def __init__(self, load):
+        self.load = load
+        self.batches = {}
+        self.tasks = set()
+
+    async def __call__(self, ids, args, kwargs):
+        from asyncio import get_event_loop, shield
+        if not isinstance(ids, (list, tuple)):
+            ids = list(ids)
+        key = call_key(args, kwargs)
+        if key is None:
+            return await self.load(ids, *args, **kwargs)
+
+        loop = get_event_loop()
+        key = loop, key
+        batch = self.batches.get(key)
+        if batch is None:
+            batch = self.batches[key] = {}, loop.create_future()
+            loop.call_soon(self.dispatch, key, args, kwargs)
+
+        batch_ids, future = batch
+        for oid in ids:
+            batch_ids[oid] = True
+
+        bresult = await shield(future)
+        return {oid: bresult[oid] for oid in ids if oid in bresult}
+
+    def dispatch(self, key, args, kwargs):
+        batch_ids, future = self.batches.pop(key)
+        task = key[0].create_task(self.resolve(list(batch_ids), future, args, kwargs))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def resolve(self, ids, future, args, kwargs):
+        try:
+            result = await self.load(ids, *args, **kwargs)
+        except BaseException as e:
+            if not future.done():
+                future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+            return
+
+        if not future.done():
+            future.set_result(result)
+
+
+class BatchMixin(object):
+    async def __call__(self, ids, *args, **kwargs):
+        return await self.loader(ids, args, kwargs)
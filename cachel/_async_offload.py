@@ -0,0 +1,47 @@
+import logging
+
+from .offload import offload_key
+
+log = logging.getLogger('cachel')
+
+
+class AsyncOffloader(object):
+    def __init__(self, concurrency=10, size=1000):
+        # asyncio is imported on first use to keep `import cachel` cheap
+        from asyncio import ensure_future
+        self.ensure_future = ensure_future
+        self.concurrency = concurrency
+        self.size = size
+        self.semaphore = None
+        self.pending = set()
+        self.tasks = set()
+
+    def __call__(self, cache, key, args, kwargs, multi=False):
+        okey = offload_key(cache, key, args, kwargs, multi)
+        if okey is not None and okey in self.pending:
+            return
+        if len(self.tasks) >= self.size:
+            return
+
+        if okey is not None:
+            self.pending.add(okey)
+        task = self.ensure_future(self.refresh(okey, cache, key, args, kwargs))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def refresh(self, okey, cache, key, args, kwargs):
+        if self.semaphore is None:
+            from asyncio import Semaphore
+            self.semaphore = Semaphore(self.concurrency)
+        try:
+            async with self.semaphore:
+                await cache.refresh(key, args, kwargs)
+        except Exception:
+            log.exception('Error refreshing offload cache key')
+        finally:
+            self.pending.discard(okey)
+
+    async def join(self):
+        from asyncio import gather
+        while self.tasks:
+            await gather(*self.tasks)
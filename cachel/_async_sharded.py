@@ -0,0 +1,36 @@
+from asyncio import gather
+
+from .base import AsyncBaseCache
+from .sharded import ShardRouter
+
+
+class AsyncShardedCache(ShardRouter, AsyncBaseCache):
+    async def get(self, key):
+        return await self.get_shard(key).get(key)
+
+    async def set(self, key, value, ttl):
+        await self.get_shard(key).set(key, value, ttl)
+
+    async def delete(self, key):
+        await self.get_shard(key).delete(key)
+
+    async def mget(self, keys):
+        groups = self.split(keys)
+        result = [None] * len(keys)
+        values = await gather(*[cache.mget(skeys) for cache, _, skeys in groups])
+        for (_, positions, _), svalues in zip(groups, values):
+            for pos, value in zip(positions, svalues):
+                result[pos] = value
+        return result
+
+    async def mset(self, items, ttl):
+        await gather(*[cache.mset(sitems, ttl)
+                       for cache, sitems in self.split_items(items)])
+
+    async def mset_ttl(self, items):
+        await gather(*[cache.mset_ttl(sitems)
+                       for cache, sitems in self.split_items(items)])
+
+    async def mdelete(self, keys):
+        await gather(*[cache.mdelete(skeys)
+                       for cache, _, skeys in self.split(keys)])
@@ -0,0 +1,14 @@
+from .stats import clock
+
+
+def async_timed(func, timer, lock):
+    async def inner(*args, **kwargs):
+        start = clock()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            elapsed = clock() - start
+            with lock:
+                timer[0] += 1
+                timer[1] += elapsed
+    return inner
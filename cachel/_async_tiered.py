@@ -0,0 +1,49 @@
+from .base import AsyncBaseCache
+from .tiered import BaseTieredCache
+
+
+class AsyncTieredCache(BaseTieredCache, AsyncBaseCache):
+    async def get(self, key):
+        value = self.l1.get(key)
+        if value is None:
+            value = await self.l2.get(key)
+            if value is not None:
+                self.l1.set(key, value, self.l1_ttl)
+        return value
+
+    async def mget(self, keys):
+        values = self.l1.mget(keys)
+        missing = [idx for idx, value in enumerate(values) if value is None]
+        if missing:
+            to_fill = []
+            l2_values = await self.l2.mget([keys[idx] for idx in missing])
+            for idx, value in zip(missing, l2_values):
+                if value is not None:
+                    values[idx] = value
+                    to_fill.append((keys[idx], value))
+            if to_fill:
+                self.l1.mset(to_fill, self.l1_ttl)
+        return values
+
+    async def set(self, key, value, ttl):
+        await self.l2.set(key, value, ttl)
+        self.l1.set(key, value, self.get_l1_ttl(ttl))
+
+    async def mset(self, items, ttl):
+        items = list(items)
+        await self.l2.mset(items, ttl)
+        self.l1.mset(items, self.get_l1_ttl(ttl))
+
+    async def mset_ttl(self, items):
+        items = list(items)
+        await self.l2.mset_ttl(items)
+        l1_ttl = self.get_l1_ttl
+        self.l1.mset_ttl([(k, v, l1_ttl(ttl)) for k, v, ttl in items])
+
+    async def delete(self, key):
+        self.l1.delete(key)
+        await self.l2.delete(key)
+
+    async def mdelete(self, keys):
+        self.l1.mdelete(keys)
+        await self.l2.mdelete(keys)
@@ -0,0 +1,47 @@
+from collections import deque
+
+from .warm import iter_chunks
+
+
+async def async_warm(wrapper, ids, args, kwargs, chunk_size, concurrency, progress):
+    from asyncio import ensure_future
+
+    processed = fetched = 0
+    pending = deque()
+
+    def submit(chunk):
+        pending.append((chunk, ensure_future(wrapper.warm_chunk(chunk, args, kwargs))))
+
+    async def complete():
+        nonlocal processed, fetched
+        chunk, task = pending.popleft()
+        missing = await task
+        processed += len(chunk)
+        fetched += len(missing)
+        if progress:
+            progress(processed, fetched)
+
+    try:
+        if hasattr(ids, '__aiter__'):
+            # chunks are collected inline, async generators need python 3.6
+            chunk = []
+            async for oid in ids:
+                chunk.append(oid)
+                if len(chunk) >= chunk_size:
+                    submit(chunk)
+                    chunk = []
+                    if len(pending) >= concurrency:
+                        await complete()
+            if chunk:
+                submit(chunk)
+        else:
+            for chunk in iter_chunks(ids, chunk_size):
+                submit(chunk)
+                if len(pending) >= concurrency:
+                    await complete()
+        while pending:
+            await complete()
+    finally:
+        for _, task in pending:
+            task.cancel()
+    return processed, fetched
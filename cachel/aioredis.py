@@ -0,0 +1,47 @@
+from __future__ import absolute_import
+
+from .base import AsyncBaseCache
+
+
+class AsyncRedisCache(AsyncBaseCache):
+    def __init__(self, url=None, client=None, unlink=False):
+        if client:
+            self.client = client
+        else:  # pragma: no cover
+            from redis.asyncio import StrictRedis
+            if url:
+                self.client = StrictRedis.from_url(url)
+            else:
+                self.client = StrictRedis()
+        self.unlink = unlink
+
+    async def get(self, key):
+        return await self.client.get(key)
+
+    async def mget(self, keys):
+        return await self.client.mget(keys)
+
+    async def delete(self, key):
+        await self.client.delete(key)
+
+    async def mdelete(self, keys):
+        if keys:
+            if self.unlink:
+                await self.client.unlink(*keys)
+            else:
+                await self.client.delete(*keys)
+
+    async def set(self, key, value, ttl):
+        await self.client.set(key, value, ex=ttl)
+
+    async def mset(self, items, ttl):
+        async with self.client.pipeline(transaction=False) as p:
+            for key, value in items:
+                p.set(key, value, ex=ttl)
+            await p.execute()
+
+    async def mset_ttl(self, items):
+        async with self.client.pipeline(transaction=False) as p:
+            for key, value, ttl in items:
+                p.set(key, value, ex=ttl)
+            await p.execute()
@@ -1,5 +1,7 @@
+import os
 import sys
 import ast
+import marshal
 import os.path
 
 from cachel.compat import COROUTINE, ASYNC_AWAIT, PY2
@@ -66,6 +68,50 @@ def transform(fname, params):
     return transformed
 
 
+def cache_fname(fname, params):
+    tag = getattr(getattr(sys, 'implementation', None), 'cache_tag', None)
+    variant = '-'.join('{}{}'.format(k, int(bool(v))) for k, v in params)
+    dirname, name = os.path.split(fname)
+    return os.path.join(dirname, '__pycache__', '{}.{}.{}.pyc'.format(
+        os.path.splitext(name)[0], variant, tag or 'py2'))
+
+
+def source_stamp(fname):
+    stamp = []
+    for it in (fname, __file__):
+        st = os.stat(it)
+        stamp.extend((int(st.st_mtime), st.st_size))
+    return tuple(stamp)
+
+
+def compile_cached(fname, params):
+    # Transformed templates are cached on disk next to regular bytecode,
+    # parsing and transforming is the most expensive part of the first
+    # decoration in a fresh process.
+    cfname = cache_fname(fname, params)
+    stamp = source_stamp(fname)
+    try:
+        with open(cfname, 'rb') as f:
+            cstamp, code = marshal.load(f)
+        if cstamp == stamp:
+            return code
+    except Exception:
+        pass
+
+    code = compile(transform(fname, dict(params)), fname, 'exec')
+    if not sys.dont_write_bytecode:
+        tmp = '{}.{}'.format(cfname, os.getpid())
+        try:
+            if not os.path.isdir(os.path.dirname(cfname)):
+                os.makedirs(os.path.dirname(cfname))
+            with open(tmp, 'wb') as f:
+                marshal.dump((stamp, code), f)
+            os.rename(tmp, cfname)
+        except (IOError, OSError):  # pragma: no cover
+            pass
+    return code
+
+
 def execute(module, params):
     key = module, params
     try:
@@ -77,8 +123,7 @@ def execute(module, params):
     parts[-1] += '.py'
 
     fname = os.path.join(os.path.dirname(__file__), *parts[1:])
-    tree = transform(fname, dict(params))
-    code = compile(tree, fname, 'exec')
+    code = compile_cached(fname, params)
     ctx = {}
     exec(code, ctx, ctx)
     GEN_CACHE[key] = ctx
@@ -1,20 +1,33 @@
-import json
+import re
+from hashlib import md5
 from functools import partial, wraps
 from string import Formatter
 from random import randint
-from inspect import CO_VARARGS, CO_VARKEYWORDS
 
 try:
-    import cPickle as pickle
+    from collections.abc import MutableMapping
 except ImportError:  # pragma: no cover py2
-    import pickle
+    from collections import MutableMapping
 
-import msgpack
+try:
+    from hashlib import blake2b
+    key_hash = partial(blake2b, digest_size=16)
+except ImportError:  # pragma: no cover py2
+    key_hash = md5
 
 from .compat import iteritems, ASYNC_AWAIT, utype
+from .compress import CODECS
 
 idfunc = lambda v: v
 
+# code flags from inspect, it is too heavy to import just for them
+CO_VARARGS = 0x04
+CO_VARKEYWORDS = 0x08
+
+# 0xc1 is never used by msgpack and is not a valid start of
+# utf-8, json or pickle data
+TOMBSTONE = b'\xc1'
+
 def u_dumps(x):
     if type(x) is utype:
         x = x.encode('utf-8')
@@ -25,22 +38,129 @@ def u_loads(x):
     return x.decode('utf-8')
 
 
-SERIALIZERS = {
-    'none': (idfunc, idfunc),
-    'unicode': (u_dumps, u_loads),
-    'json': (partial(json.dumps, ensure_ascii=False), json.loads),
-    'pickle': (partial(pickle.dumps, protocol=2), pickle.loads),
-    'msgpack': (partial(msgpack.dumps, use_bin_type=True),
-                partial(msgpack.loads, encoding='utf-8')),
-}
+class Serializer(tuple):
+    # (dumps, loads) pair which can also provide a batch loader,
+    # loads_many(values) -> list of loaded values in the same order
+    def __new__(cls, dumps, loads, loads_many=None):
+        serializer = tuple.__new__(cls, (dumps, loads))
+        serializer.loads_many = loads_many
+        return serializer
+
+
+def get_loads_many(serializer):
+    loads_many = getattr(serializer, 'loads_many', None)
+    if loads_many is None:
+        loads = serializer[1]
+        loads_many = lambda values: [loads(it) for it in values]
+    return loads_many
+
 
-try:  # pragma: no cover
+def json_serializer():
+    import json
+    return partial(json.dumps, ensure_ascii=False), json.loads
+
+
+def ujson_serializer():
     import ujson
-    SERIALIZERS['ujson'] = partial(ujson.dumps, ensure_ascii=False), ujson.loads
-    SERIALIZERS['slow_json'] = SERIALIZERS['json']
-    SERIALIZERS['json'] = SERIALIZERS['ujson']
-except ImportError:  # pragma: no cover
-    pass
+    return partial(ujson.dumps, ensure_ascii=False), ujson.loads
+
+
+def fast_json_serializer():
+    try:
+        return ujson_serializer()
+    except ImportError:  # pragma: no cover
+        return json_serializer()
+
+
+def pickle_serializer():
+    try:
+        import cPickle as pickle
+    except ImportError:  # pragma: no cover py2
+        import pickle
+    return partial(pickle.dumps, protocol=2), pickle.loads
+
+
+def msgpack_serializer():
+    import msgpack
+    loads = partial(msgpack.loads, raw=False)
+
+    def loads_many(values):
+        # One streaming unpacker for the whole batch avoids a python level
+        # call setup per value. Each value must end exactly on its own
+        # boundary, otherwise plain loads is used to raise a proper error.
+        if len(values) < 2:
+            return [loads(it) for it in values]
+        unpacker = msgpack.Unpacker(None, raw=False)
+        feed, unpack, tell = unpacker.feed, unpacker.unpack, unpacker.tell
+        result = []
+        end = 0
+        try:
+            for it in values:
+                feed(it)
+                end += len(it)
+                result.append(unpack())
+                if tell() != end:
+                    break
+            else:
+                return result
+        except Exception:
+            pass
+        return [loads(it) for it in values]
+
+    return Serializer(partial(msgpack.dumps, use_bin_type=True), loads, loads_many)
+
+
+# Serializer modules are imported on first access to keep
+# `import cachel` cheap for short lived processes.
+class Serializers(MutableMapping):
+    def __init__(self, loaders, serializers):
+        self.loaders = loaders
+        self.serializers = serializers
+
+    def __getitem__(self, name):
+        try:
+            return self.serializers[name]
+        except KeyError:
+            pass
+        serializer = self.serializers[name] = self.loaders[name]()
+        return serializer
+
+    def __setitem__(self, name, serializer):
+        self.serializers[name] = serializer
+
+    def __delitem__(self, name):
+        loader = self.loaders.pop(name, None)
+        if self.serializers.pop(name, None) is None and loader is None:
+            raise KeyError(name)
+
+    def __contains__(self, name):
+        try:
+            self[name]
+        except (KeyError, ImportError):
+            return False
+        return True
+
+    def __iter__(self):
+        for name in list(self.serializers):
+            yield name
+        for name in list(self.loaders):
+            if name not in self.serializers and name in self:
+                yield name
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+SERIALIZERS = Serializers({
+    'json': fast_json_serializer,
+    'slow_json': json_serializer,
+    'ujson': ujson_serializer,
+    'pickle': pickle_serializer,
+    'msgpack': msgpack_serializer,
+}, {
+    'none': (idfunc, idfunc),
+    'unicode': (u_dumps, u_loads),
+})
 
 formatter = Formatter()
 
@@ -52,10 +172,20 @@ def gen_expire(expire, spread=10):
 
 
 def get_serializer(fmt):
+    if isinstance(fmt, tuple):
+        return fmt
+
+    name, _, codec = fmt.partition('+')
     try:
-        return SERIALIZERS[fmt]
+        serializer = SERIALIZERS[name]
+        if codec:
+            serializer = CODECS[codec](serializer)
+        return serializer
     except KeyError:
         raise Exception('Unknown serializer: {}'.format(fmt))
+    except ImportError as e:
+        # lazy loaders import serializer modules on first use
+        raise Exception('Unknown serializer: {} ({})'.format(fmt, e))
 
 
 def get_expire(ttl, fuzzy_ttl):
@@ -66,34 +196,109 @@ def get_expire(ttl, fuzzy_ttl):
     return ttl
 
 
-def make_key_func(tpl, func, multi=False):
-    if callable(tpl):
-        return tpl
+# room for a full hex digest and a separator
+MIN_KEY_SIZE = 33
 
-    fields = list(formatter.parse(tpl))
-    if len(fields) == 1 and fields[0][1] is None:
-        return lambda *args, **kwargs: tpl
 
-    c = func.__code__
-    assert (not c.co_flags & (CO_VARKEYWORDS | CO_VARARGS)), \
-        'functions with varargs are not supported'
+def digest_key(key, max_size):
+    # backend key limits are in bytes
+    data = key.encode('utf-8')
+    if len(data) <= max_size:
+        return key
+    digest = key_hash(data).hexdigest()
+    if max_size <= len(digest) + 1:
+        return digest[:max_size]
+    prefix = data[:max_size - len(digest) - 1].decode('utf-8', 'ignore')
+    return '{}:{}'.format(prefix, digest)
+
 
-    sargs = args = c.co_varnames[:c.co_argcount]
+def bound_key_func(keyfunc, max_size, multi=False):
     if multi:
-        args = ['id'] + list(args[1:])
-    for f in fields:
-        assert not f[1] or f[1] in args, \
-            'unknown param: "{}", valid fields are {}'.format(f[1], args)
+        return lambda *args, **kwargs: [
+            digest_key(k, max_size) for k in keyfunc(*args, **kwargs)]
+    return lambda *args, **kwargs: digest_key(keyfunc(*args, **kwargs), max_size)
+
+
+def get_signature(func):
+    c = func.__code__
+    names = c.co_varnames
+    idx = c.co_argcount + getattr(c, 'co_kwonlyargcount', 0)
+    args = names[:c.co_argcount]
+    kwonly = names[c.co_argcount:idx]
+    varargs = varkw = None
+    if c.co_flags & CO_VARARGS:
+        varargs = names[idx]
+        idx += 1
+    if c.co_flags & CO_VARKEYWORDS:
+        varkw = names[idx]
 
     fd = func.__defaults__ or ()
-    defaults = {arg: value for arg, value in zip(args[-len(fd):], fd)}
+    defaults = dict(zip(args[len(args) - len(fd):], fd))
+    defaults.update(getattr(func, '__kwdefaults__', None) or {})
 
     signature = []
-    for arg in sargs:
-        if arg in defaults:
+    for arg in args + ('*',) + kwonly:
+        if arg == '*':
+            if varargs:
+                signature.append('*' + varargs)
+            elif kwonly:
+                signature.append(arg)
+        elif arg in defaults:
             signature.append('{}={}'.format(arg, repr(defaults[arg])))
         else:
             signature.append(arg)
+    if varkw:
+        signature.append('**' + varkw)
+
+    names = list(args + kwonly) + [it for it in (varargs, varkw) if it]
+    return args, names, ', '.join(signature)
+
+
+field_base = re.compile(r'[^.\[]*').match
+field_path = re.compile(r'\.(\w+)|\[([^\]]*)\]')
+
+
+def split_field(name):
+    base = field_base(name).group()
+    return base, name[len(base):]
+
+
+def compile_path(expr, path):
+    assert not field_path.sub('', path), 'invalid field path: "{}"'.format(path)
+    for attr, item in field_path.findall(path):
+        if attr:
+            expr += '.' + attr
+        else:
+            expr += '[{}]'.format(item if item.isdigit() else repr(item))
+    return expr
+
+
+def make_key_func(tpl, func, multi=False, max_size=None, spec=None):
+    if max_size and max_size < MIN_KEY_SIZE:
+        raise Exception('max_key_size should be at least {}'.format(MIN_KEY_SIZE))
+
+    if callable(tpl):
+        if max_size:
+            return bound_key_func(tpl, max_size, multi)
+        return tpl
+
+    fields = list(formatter.parse(tpl))
+    if len(fields) == 1 and fields[0][1] is None:
+        if max_size:
+            tpl = digest_key(tpl, max_size)
+        return lambda *args, **kwargs: tpl
+
+    if spec is not None and not callable(spec):
+        spec = eval('lambda {}: None'.format(spec))
+
+    sargs, names, signature = get_signature(spec or func)
+    args = sargs
+    if multi:
+        args = ['id'] + list(args[1:])
+        names = ['id'] + names[1:]
+    for f in fields:
+        assert not f[1] or split_field(f[1])[0] in ('', ) + tuple(names), \
+            'unknown param: "{}", valid fields are {}'.format(f[1], names)
 
     targs = []
     template = []
@@ -104,23 +309,44 @@ def make_key_func(tpl, func, multi=False):
             template.append(sep)
 
         if name is not None:
-            if name:
-                targs.append(name)
-            else:
-                targs.append(args[aidx])
+            name, path = split_field(name)
+            if not name:
+                name = args[aidx]
                 aidx += 1
+            targs.append(compile_path(name, path))
             template.append('{{{}:{}}}'.format(idx, fmt))
             idx += 1
 
-    signature = ', '.join(signature)
     ftpl = ''.join(template)
+    context = {'tpl': ftpl, 'digest': digest_key, 'size': max_size}
     if multi:
-        context = {'tpl': ftpl}
-        return eval('lambda {}: [tpl.format({}) for id in {}]'.format(
-            signature, ', '.join(targs), sargs[0]), context)
+        if max_size:
+            expr = ("[k if len(k.encode('utf-8')) <= size else digest(k, size)"
+                    ' for k in [tpl.format({}) for id in {}]]')
+        else:
+            expr = '[tpl.format({}) for id in {}]'
+        return eval('lambda {}: {}'.format(
+            signature, expr.format(', '.join(targs), sargs[0])), context)
+    else:
+        expr = 'digest({}.format({}), size)' if max_size else '{}.format({})'
+        return eval('lambda {}: {}'.format(
+            signature, expr.format(repr(ftpl), ', '.join(targs))), context)
+
+
+def hashable_or_none(key):
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def call_key(args, kwargs):
+    if kwargs:
+        key = args, tuple(sorted(kwargs.items()))
     else:
-        return eval('lambda {}: {}.format({})'.format(
-            signature, repr(ftpl), ', '.join(targs)))
+        key = args
+    return hashable_or_none(key)
 
 
 class BaseCache(object):
@@ -140,6 +366,15 @@ class BaseCache(object):
         for k, v in items:
             self.set(k, v, expire)
 
+    def mset_ttl(self, items):
+        # one mset per distinct ttl, backends with native
+        # per-key ttl batch writes should override it
+        groups = {}
+        for k, v, expire in items:
+            groups.setdefault(expire, []).append((k, v))
+        for expire, group in iteritems(groups):
+            self.mset(group, expire)
+
     def mdelete(self, keys):
         for k in keys:
             self.delete(k)
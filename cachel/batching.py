@@ -0,0 +1,78 @@
+from threading import Lock, Event
+
+from .base import BaseCache
+
+
+class _Batch(object):
+    __slots__ = 'keys', 'full', 'done', 'result', 'error'
+
+    def __init__(self):
+        self.keys = {}
+        self.full = Event()
+        self.done = Event()
+        self.result = None
+        self.error = None
+
+
+class BatchingCache(BaseCache):
+    def __init__(self, cache, window=0.0002, max_keys=100):
+        self.cache = cache
+        self.window = window
+        self.max_keys = max_keys
+        self.lock = Lock()
+        self.batch = None
+
+    def get(self, key):
+        return self.mget([key])[0]
+
+    def mget(self, keys):
+        if len(keys) >= self.max_keys:
+            return self.cache.mget(keys)
+
+        with self.lock:
+            batch = self.batch
+            leader = batch is None
+            if leader:
+                batch = self.batch = _Batch()
+            for k in keys:
+                batch.keys[k] = True
+            if len(batch.keys) >= self.max_keys:
+                self.batch = None
+                batch.full.set()
+
+        if leader:
+            # The first reader waits for a window, collecting keys of
+            # concurrent readers, and fetches all of them with one mget.
+            batch.full.wait(self.window)
+            with self.lock:
+                if self.batch is batch:
+                    self.batch = None
+            try:
+                bkeys = list(batch.keys)
+                batch.result = dict(zip(bkeys, self.cache.mget(bkeys)))
+            except Exception as e:
+                batch.error = e
+            finally:
+                batch.done.set()
+        else:
+            batch.done.wait()
+
+        if batch.error is not None:
+            raise batch.error
+        result = batch.result
+        return [result[k] for k in keys]
+
+    def set(self, key, value, ttl):
+        self.cache.set(key, value, ttl)
+
+    def delete(self, key):
+        self.cache.delete(key)
+
+    def mset(self, items, ttl):
+        self.cache.mset(items, ttl)
+
+    def mset_ttl(self, items):
+        self.cache.mset_ttl(items)
+
+    def mdelete(self, keys):
+        self.cache.mdelete(keys)
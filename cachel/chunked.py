@@ -0,0 +1,70 @@
+from .base import BaseCache
+from .compat import ASYNC_AWAIT
+
+
+def chunks(seq, size):
+    for start in range(0, len(seq), size):
+        yield seq[start:start + size]
+
+
+def unique_keys(keys):
+    index = {}
+    positions = [index.setdefault(k, len(index)) for k in keys]
+    if len(index) == len(positions):
+        return keys, None
+    return list(index), positions
+
+
+def unique_items(items):
+    return list(dict((it[0], it) for it in items).values())
+
+
+class BaseChunkedCache(object):
+    def __init__(self, cache, chunk_size=1000):
+        self.cache = cache
+        self.chunk_size = chunk_size
+
+
+class ChunkedCache(BaseChunkedCache, BaseCache):
+    def get(self, key):
+        return self.cache.get(key)
+
+    def set(self, key, value, ttl):
+        self.cache.set(key, value, ttl)
+
+    def delete(self, key):
+        self.cache.delete(key)
+
+    def mget(self, keys):
+        if len(keys) <= self.chunk_size:
+            return self.cache.mget(keys)
+
+        keys, positions = unique_keys(keys)
+        result = []
+        for chunk in chunks(keys, self.chunk_size):
+            result.extend(self.cache.mget(chunk))
+        if positions is not None:
+            result = [result[it] for it in positions]
+        return result
+
+    def mset(self, items, ttl):
+        for chunk in chunks(unique_items(items), self.chunk_size):
+            self.cache.mset(chunk, ttl)
+
+    def mset_ttl(self, items):
+        for chunk in chunks(unique_items(items), self.chunk_size):
+            self.cache.mset_ttl(chunk)
+
+    def mdelete(self, keys):
+        for chunk in chunks(unique_keys(keys)[0], self.chunk_size):
+            self.cache.mdelete(chunk)
+
+
+def chunked(cache, chunk_size, concurrency=4):
+    if getattr(cache, 'is_async', False):
+        return AsyncChunkedCache(cache, chunk_size, concurrency)
+    return ChunkedCache(cache, chunk_size)
+
+
+if ASYNC_AWAIT:  # pragma: no cover
+    from ._async_chunked import AsyncChunkedCache
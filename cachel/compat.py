@@ -4,6 +4,7 @@ PY2 = sys.version_info[0] == 2
 ASYNC_AWAIT = sys.version_info[:2] >= (3, 5)
 COROUTINE = sys.version_info[:2] >= (3, 4)
 ASYNC_COMPREHENSIONS = sys.version_info[:2] >= (3, 6)
+MODULE_GETATTR = sys.version_info[:2] >= (3, 7)
 
 utype = type(u'')
 
@@ -21,7 +22,17 @@ if PY2:  # pragma: no cover
 
 else:  # pragma: no cover
     import builtins
-    from asyncio import iscoroutinefunction
+
+    def iscoroutinefunction(fun):
+        # asyncio is one of the most expensive imports, do not pull it
+        # in for sync only programs. Without asyncio loaded there are no
+        # @asyncio.coroutine functions and CO_COROUTINE flag is enough.
+        asyncio = sys.modules.get('asyncio')
+        if asyncio is not None:
+            return asyncio.iscoroutinefunction(fun)
+        code = getattr(fun, '__code__', None)
+        return bool(code is not None and code.co_flags & 0x80)
+
     iterkeys = lambda d: d.keys()
     itervalues = lambda d: d.values()
     iteritems = lambda d: d.items()
@@ -0,0 +1,56 @@
+import zlib
+
+from .compat import PY2, utype
+
+# 0xc1 is never used by msgpack and can not start utf-8, json or pickle
+# data, so values written before the codec was enabled are recognized
+MAGIC = b'\xc1z'
+RAW = MAGIC + b'\x00'
+ZLIB = MAGIC + b'\x01'
+ZLIB_DICT = MAGIC + b'\x02'
+HEADER_SIZE = len(RAW)
+
+
+def zlib_serializer(serializer, threshold=1024, level=6, zdict=None):
+    dumps, loads = serializer
+
+    if zdict and PY2:  # pragma: no cover
+        raise Exception('zdict requires python 3.3+')
+
+    if zdict:
+        def compress(data):
+            c = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS,
+                                 zlib.DEF_MEM_LEVEL, zlib.Z_DEFAULT_STRATEGY, zdict)
+            return ZLIB_DICT + c.compress(data) + c.flush()
+    else:
+        def compress(data):
+            return ZLIB + zlib.compress(data, level)
+
+    def cdumps(value):
+        data = dumps(value)
+        if type(data) is utype:
+            data = data.encode('utf-8')
+        if len(data) < threshold:
+            return RAW + data
+        return compress(data)
+
+    def cloads(data):
+        header = data[:HEADER_SIZE]
+        if header == ZLIB:
+            return loads(zlib.decompress(data[HEADER_SIZE:]))
+        elif header == ZLIB_DICT:
+            if not zdict:
+                raise Exception('zdict is required to decompress value')
+            d = zlib.decompressobj(zdict=zdict)
+            return loads(d.decompress(data[HEADER_SIZE:]) + d.flush())
+        elif header == RAW:
+            return loads(data[HEADER_SIZE:])
+        # value written before the codec was enabled
+        return loads(data)
+
+    return cdumps, cloads
+
+
+CODECS = {
+    'zlib': zlib_serializer,
+}
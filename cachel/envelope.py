@@ -0,0 +1,40 @@
+from struct import Struct
+
+from .compat import utype
+
+# 0xc1 is never used by msgpack and can not start utf-8, json or
+# pickle data, the second byte tells the envelope from codec headers
+MAGIC = b'\xc1e'
+VERSION = 1
+
+# magic, version, flags, expire timestamp, compute time
+HEADER = Struct('!2sBBdf')
+HEADER_SIZE = HEADER.size
+PREFIX = MAGIC + bytes(bytearray([VERSION]))
+
+# fast path to read only expire timestamp
+EXPIRE = Struct('!d')
+EXPIRE_OFFSET = 4
+
+
+def pack(data, expire, delta=0.0, flags=0):
+    if type(data) is utype:
+        data = data.encode('utf-8')
+    return HEADER.pack(MAGIC, VERSION, flags, expire, delta) + data
+
+
+def is_packed(data):
+    return len(data) >= HEADER_SIZE and data[:len(PREFIX)] == PREFIX
+
+
+def unpack(data):
+    # foreign values, e.g. written before an envelope option was enabled
+    # on an existing keyspace, are reported as None and treated as misses
+    if not is_packed(data):
+        return None
+    _, _, flags, expire, delta = HEADER.unpack_from(data)
+    return expire, delta, data[HEADER_SIZE:]
+
+
+def unpack_expire(data):
+    return EXPIRE.unpack_from(data, EXPIRE_OFFSET)[0], data[HEADER_SIZE:]
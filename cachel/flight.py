@@ -0,0 +1,90 @@
+from threading import Lock, Event
+
+from .compat import ASYNC_AWAIT
+
+MISSING = object()
+
+
+class _Call(object):
+    __slots__ = 'event', 'result', 'error'
+
+    def __init__(self):
+        self.event = Event()
+        self.result = MISSING
+        self.error = None
+
+    def wait(self):
+        self.event.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight(object):
+    def __init__(self):
+        self.lock = Lock()
+        self.calls = {}
+
+    def __call__(self, key, func, *args):
+        with self.lock:
+            call = self.calls.get(key)
+            if call is not None:
+                leader = False
+            else:
+                leader = True
+                call = self.calls[key] = _Call()
+
+        if not leader:
+            return call.wait()
+
+        try:
+            call.result = func(*args)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.event.set()
+
+    def multi(self, keys, ids, func, *args):
+        owned = []
+        waiting = []
+        with self.lock:
+            calls = self.calls
+            for key, oid in zip(keys, ids):
+                call = calls.get(key)
+                if call is None:
+                    call = calls[key] = _Call()
+                    owned.append((key, oid, call))
+                else:
+                    waiting.append((oid, call))
+
+        result = {}
+        if owned:
+            try:
+                result.update(func(set(it[1] for it in owned), *args))
+                for _, oid, call in owned:
+                    call.result = result.get(oid, MISSING)
+            except BaseException as e:
+                for _, _, call in owned:
+                    call.error = e
+                raise
+            finally:
+                with self.lock:
+                    for key, _, _ in owned:
+                        del calls[key]
+                for _, _, call in owned:
+                    call.event.set()
+
+        for oid, call in waiting:
+            value = call.wait()
+            if value is not MISSING:
+                result[oid] = value
+
+        return result
+
+
+if ASYNC_AWAIT:  # pragma: no cover
+    from ._async_flight import AsyncSingleFlight
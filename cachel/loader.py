@@ -0,0 +1,22 @@
+from .compat import ASYNC_AWAIT
+
+_classes = {}
+
+
+def batched_class(cls):
+    try:
+        return _classes[cls]
+    except KeyError:
+        pass
+    result = _classes[cls] = type(cls.__name__, (BatchMixin, cls), {})
+    return result
+
+
+def batched(wrapper):
+    wrapper.__class__ = batched_class(type(wrapper))
+    wrapper.loader = AsyncBatchLoader(super(BatchMixin, wrapper).__call__)
+    return wrapper
+
+
+if ASYNC_AWAIT:  # pragma: no cover
+    from ._async_loader import AsyncBatchLoader, BatchMixin
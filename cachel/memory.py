@@ -0,0 +1,109 @@
+from collections import OrderedDict
+from threading import Lock
+from time import time
+
+from .base import BaseCache
+
+INF = float('inf')
+
+
+class MemoryCache(BaseCache):
+    def __init__(self, max_items=10000, max_size=None, cleanup_interval=60):
+        self.max_items = max_items
+        self.max_size = max_size
+        self.cleanup_interval = cleanup_interval
+        self.size = 0
+        self.data = OrderedDict()
+        self.lock = Lock()
+        self.next_cleanup = time() + cleanup_interval
+
+    def _get(self, key, now):
+        data = self.data
+        item = data.pop(key, None)
+        if item is None:
+            return None
+
+        if item[1] < now:
+            self.size -= item[2]
+            return None
+
+        data[key] = item
+        return item[0]
+
+    def _set(self, key, value, ttl, now):
+        data = self.data
+        size = len(value) if self.max_size else 0
+        old = data.pop(key, None)
+        if old is not None:
+            self.size -= old[2]
+
+        if self.max_size and size > self.max_size:
+            return
+
+        data[key] = value, now + ttl if ttl else INF, size
+        self.size += size
+
+    def _delete(self, key):
+        old = self.data.pop(key, None)
+        if old is not None:
+            self.size -= old[2]
+
+    def _evict(self, now):
+        data = self.data
+        if now >= self.next_cleanup:
+            self.next_cleanup = now + self.cleanup_interval
+            for key in [k for k, v in data.items() if v[1] < now]:
+                self.size -= data.pop(key)[2]
+
+        max_items = self.max_items
+        max_size = self.max_size
+        while ((max_items and len(data) > max_items)
+               or (max_size and self.size > max_size)):
+            self.size -= data.popitem(last=False)[1][2]
+
+    def get(self, key):
+        with self.lock:
+            return self._get(key, time())
+
+    def mget(self, keys):
+        now = time()
+        get = self._get
+        with self.lock:
+            return [get(k, now) for k in keys]
+
+    def set(self, key, value, ttl):
+        now = time()
+        with self.lock:
+            self._set(key, value, ttl, now)
+            self._evict(now)
+
+    def mset(self, items, ttl):
+        now = time()
+        set = self._set
+        with self.lock:
+            for k, v in items:
+                set(k, v, ttl, now)
+            self._evict(now)
+
+    def mset_ttl(self, items):
+        now = time()
+        set = self._set
+        with self.lock:
+            for k, v, ttl in items:
+                set(k, v, ttl, now)
+            self._evict(now)
+
+    def delete(self, key):
+        with self.lock:
+            self._delete(key)
+
+    def mdelete(self, keys):
+        delete = self._delete
+        with self.lock:
+            for k in keys:
+                delete(k)
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+            self.size = 0
@@ -1,157 +1,64 @@
 import logging
 from functools import wraps
 from collections import deque
-from threading import Thread
-from time import time, sleep
-
-from .base import make_key_func, get_serializer, get_expire
-from .compat import PY2, listitems
+from threading import Thread, Condition
+from time import time
+
+from . import compat
+from .base import (make_key_func, get_serializer, get_expire, get_loads_many,
+                   call_key, hashable_or_none)
+from .compat import PY2, ASYNC_AWAIT, MODULE_GETATTR
+from .envelope import is_packed, pack, unpack_expire
+from .stats import instrument
+from .chunked import chunked
+from .wrappers import load_offload_wrappers
 
 log = logging.getLogger('cachel')
 
 
-class OffloadCacheWrapper(object):
+class BaseOffloadCacheWrapper(object):
     def __init__(self, func, keyfunc, serializer, cache1,
-                 cache2, ttl1, ttl2, expire, offload):
+                 cache2, ttl1, ttl2, expire, offload, negative_ttl=None,
+                 legacy_format=False):
         self.id = '{}.{}'.format(func.__module__, func.__name__)
         self.func = func
         self.cache1 = cache1
         self.cache2 = cache2
         self.keyfunc = keyfunc
         self.dumps, self.loads = serializer
+        self.loads_many = get_loads_many(serializer)
         self.ttl1 = ttl1
         self.ttl2 = ttl2
         self.expire = expire or ttl1
         self.offload = offload
+        self.negative_ttl = negative_ttl
+        self.legacy_format = legacy_format
 
-    def __call__(self, *args, **kwargs):
-        k = self.keyfunc(*args, **kwargs)
-        result = self.cache1.get(k)
-        if result is None:
-            result = self.cache2.get(k)
-            if result is None:
-                result = self.func(*args, **kwargs)
-                sdata = self.dumps(result)
-                self.cache1.set(k, sdata, self.ttl1)
-                self.cache2.set(k, self.dumps2(sdata), self.ttl2)
-            else:
-                expire, result = self.loads2(result)
-                self.cache1.set(k, result, self.ttl1)
-                if time() > expire:
-                    self.offload(self, k, args, kwargs)
-                return self.loads(result)
-            return result
-        else:
-            return self.loads(result)
+    def now(self):
+        return time()
 
     def loads2(self, data):
+        if is_packed(data):
+            return unpack_expire(data)
+        # legacy "<expire>:<data>" format written by older versions
         expire, _, data = data.partition(b':')
         return int(expire), data
 
-    def dumps2(self, data, now=None):  # pragma: nocover
-        expire = int((now or time()) + self.expire)
-        if PY2:
-            return '{}:{}'.format(expire, data)
-        else:
+    def dumps2(self, data, now=None):
+        expire = (now or time()) + self.expire
+        if self.legacy_format:
+            # readable by versions before the binary envelope,
+            # used during rolling deploys
+            expire = int(expire)
+            if PY2:  # pragma: no cover
+                return '{}:{}'.format(expire, data)
             return str(expire).encode() + b':' + data
-
-    def get(self, *args, **kwargs):
-        k = self.keyfunc(*args, **kwargs)
-        result = self.cache2.get(k)
-        if result:
-            return self.loads(self.loads2(result)[1])
-
-    def set(self, value, *args, **kwargs):
-        k = self.keyfunc(*args, **kwargs)
-        self.cache2.set(k, self.dumps2(self.dumps(value)), self.ttl2)
-
-    def invalidate(self, *args, **kwargs):
-        key = self.keyfunc(*args, **kwargs)
-        self.cache2.delete(key)
-
-
-class OffloadObjectsCacheWrapper(OffloadCacheWrapper):
-    def __call__(self, ids, *args, **kwargs):
-        if not isinstance(ids, (list, tuple)):
-            ids = list(ids)
-
-        loads = self.loads
-        loads2 = self.loads2
-        now = time()
-
-        keys = self.keyfunc(ids, *args, **kwargs)
-        cresult = {}
-        if keys:
-            for oid, value in zip(ids, self.cache1.mget(keys)):
-                if value is not None:
-                    cresult[oid] = loads(value)
-
-        c2_ids_to_fetch = list(set(ids) - set(cresult))
-        c2_keys = self.keyfunc(c2_ids_to_fetch, *args, **kwargs)
-        c2_result = {}
-        offload_ids = []
-        update_data = []
-        if c2_ids_to_fetch:
-            for key, oid, value in zip(c2_keys, c2_ids_to_fetch, self.cache2.mget(c2_keys)):
-                if value is not None:
-                    expire, data = loads2(value)
-                    update_data.append((key, data))
-                    if now > expire:
-                        offload_ids.append(oid)
-                    c2_result[oid] = loads(data)
-            cresult.update(c2_result)
-
-        if update_data:
-            self.cache1.mset(update_data, self.ttl1)
-
-        if offload_ids:
-            self.offload(self, offload_ids, args, kwargs, multi=True)
-
-        ids_to_fetch = set(c2_ids_to_fetch) - set(c2_result)
-        if ids_to_fetch:
-            fresult = self._get_func_result(ids_to_fetch, args, kwargs, now)
-            cresult.update(fresult)
-
-        return cresult
-
-    def _get_func_result(self, ids, args, kwargs, now=None):
-        now = now or time()
-        dumps = self.dumps
-        dumps2 = self.dumps2
-        fresult = self.func(ids, *args, **kwargs)
-        if fresult:
-            to_cache_pairs = listitems(fresult)
-            to_cache_ids, to_cache_values = zip(*to_cache_pairs)
-            keys = self.keyfunc(to_cache_ids, *args, **kwargs)
-            values = [dumps(r) for r in to_cache_values]
-            evalues = [dumps2(r, now) for r in values]
-            self.cache1.mset(zip(keys, values), self.ttl1)
-            self.cache2.mset(zip(keys, evalues), self.ttl2)
-
-        nonexisting_ids = set(ids) - set(fresult)
-        if nonexisting_ids:
-            self.invalidate(nonexisting_ids, *args, **kwargs)
-
-        return fresult
-
-    def one(self, id, *args, **kwargs):
-        default = kwargs.pop('_default', None)
-        return self([id], *args, **kwargs).get(id, default)
-
-    def invalidate(self, ids, *args, **kwargs):
-        keys = self.keyfunc(ids, *args, **kwargs)
-        self.cache2.mdelete(keys)
+        return pack(data, expire)
 
 
 def default_offload(cache, key, args, kwargs, multi=False):
     try:
-        if multi:
-            cache._get_func_result(key, args, kwargs)
-        else:
-            result = cache.func(*args, **kwargs)
-            sdata = cache.dumps(result)
-            cache.cache1.set(key, sdata, cache.ttl1)
-            cache.cache2.set(key, cache.dumps2(sdata), cache.ttl2)
+        cache.refresh(key, args, kwargs)
     except Exception:
         log.exception('Error refreshing offload cache key')
 
@@ -167,7 +74,8 @@ def offloader(func):
 
 class make_offload_cache(object):
     def __init__(self, cache1, cache2, ttl1=600, ttl2=None, expire=None, fmt='msgpack',
-                 fuzzy_ttl=True, offload=None):
+                 fuzzy_ttl=True, offload=None, negative_ttl=None, stats=False,
+                 max_key_size=None, legacy_format=False):
         self.caches = {}
         self.cache1 = cache1
         self.cache2 = cache2
@@ -177,33 +85,75 @@ class make_offload_cache(object):
         self.fmt = fmt
         self.fuzzy_ttl = fuzzy_ttl
         self.offload = offload
-
-    def _wrapper(self, cls, tpl, ttl1, ttl2, expire, fmt, fuzzy_ttl, multi=False):
+        self.negative_ttl = negative_ttl
+        self.stats = stats
+        self.max_key_size = max_key_size
+        self.legacy_format = legacy_format
+        self.async_offload = None
+
+    def get_offload(self, async_call):
+        if self.offload:
+            return self.offload
+        if not async_call:
+            return default_offload
+        if not self.async_offload:
+            self.async_offload = AsyncOffloader()
+        return self.async_offload
+
+    def _option(self, options, name):
+        value = options.get(name)
+        return getattr(self, name) if value is None else value
+
+    def _wrapper(self, tpl, options, multi=False):
         def decorator(func):
-            ttl = ttl1 or self.ttl1
-            fttl = self.fuzzy_ttl if fuzzy_ttl is None else fuzzy_ttl
+            option = lambda name: self._option(options, name)
+            async_fn = compat.iscoroutinefunction(func)
+            async_cache1 = getattr(self.cache1, 'is_async', False)
+            async_cache2 = getattr(self.cache2, 'is_async', False)
+            m = load_offload_wrappers(async_fn, async_cache1, async_cache2)
+            cls = m['OffloadObjectsCacheWrapper'] if multi else m['OffloadCacheWrapper']
+            ttl = options.get('ttl1') or self.ttl1
+            cache1, cache2 = self.cache1, self.cache2
+            if options.get('chunk_size'):
+                concurrency = options.get('concurrency') or 4
+                cache1 = chunked(cache1, options['chunk_size'], concurrency)
+                cache2 = chunked(cache2, options['chunk_size'], concurrency)
+
             cache = cls(
                 func,
-                make_key_func(tpl, func, multi),
-                get_serializer(fmt or self.fmt),
-                self.cache1,
-                self.cache2,
-                get_expire(ttl, fttl),
-                ttl2 or self.ttl2 or ttl * 2,
-                expire or self.expire,
-                self.offload or default_offload
+                make_key_func(tpl, func, multi, option('max_key_size'),
+                              options.get('key_spec')),
+                get_serializer(options.get('fmt') or self.fmt),
+                cache1,
+                cache2,
+                get_expire(ttl, option('fuzzy_ttl')),
+                options.get('ttl2') or self.ttl2 or ttl * 2,
+                options.get('expire') or self.expire,
+                self.get_offload(async_fn or async_cache1 or async_cache2),
+                option('negative_ttl'),
+                self.legacy_format
             )
+            if option('stats'):
+                cache = instrument(cache, multi, cache.id)
             self.caches[cache.id] = cache
             return wraps(func)(cache)
         return decorator
 
-    def __call__(self, tpl, ttl1=None, ttl2=None, expire=None, fmt=None, fuzzy_ttl=None):
-        return self._wrapper(OffloadCacheWrapper, tpl, ttl1,
-                             ttl2, expire, fmt, fuzzy_ttl)
-
-    def objects(self, tpl, ttl1=None, ttl2=None, expire=None, fmt=None, fuzzy_ttl=None):
-        return self._wrapper(OffloadObjectsCacheWrapper, tpl, ttl1, ttl2,
-                             expire,fmt, fuzzy_ttl, multi=True)
+    def __call__(self, tpl, ttl1=None, ttl2=None, expire=None, fmt=None, fuzzy_ttl=None,
+                 stats=None, max_key_size=None, key_spec=None):
+        return self._wrapper(tpl, dict(
+            ttl1=ttl1, ttl2=ttl2, expire=expire, fmt=fmt, fuzzy_ttl=fuzzy_ttl,
+            stats=stats, max_key_size=max_key_size,
+            key_spec=key_spec))
+
+    def objects(self, tpl, ttl1=None, ttl2=None, expire=None, fmt=None, fuzzy_ttl=None,
+                negative_ttl=None, stats=None, max_key_size=None, key_spec=None,
+                chunk_size=None, concurrency=None):
+        return self._wrapper(tpl, dict(
+            ttl1=ttl1, ttl2=ttl2, expire=expire, fmt=fmt, fuzzy_ttl=fuzzy_ttl,
+            negative_ttl=negative_ttl, stats=stats, max_key_size=max_key_size,
+            key_spec=key_spec, chunk_size=chunk_size, concurrency=concurrency),
+            multi=True)
 
     def offload_helper(self, params):
         cache_id = params.pop('cache_id')
@@ -215,34 +165,151 @@ class make_offload_cache(object):
         default_offload(cache, **params)
 
 
+def offload_key(cache, key, args, kwargs, multi):
+    if not multi:
+        return cache.id, key
+    akey = call_key(args, kwargs)
+    return None if akey is None else hashable_or_none((cache.id, frozenset(key), akey))
+
+
+def batch_key(cache, args, kwargs):
+    akey = call_key(args, kwargs)
+    return None if akey is None else (cache.id, akey)
+
+
 class ThreadOffloader(object):
-    def __init__(self, size=1000):
-        self.queue = deque(maxlen=size)
+    def __init__(self, size=1000, workers=1, batch_size=1000, window=0):
+        self.size = size
+        self.workers = workers
+        self.batch_size = batch_size
+        self.window = window
+        self.queue = deque()
+        self.pending = set()
+        self.batches = {}
+        self.cond = Condition()
+        self.counters = {'queued': 0, 'deduplicated': 0, 'merged': 0, 'dropped': 0,
+                         'processed': 0, 'latency': 0.0, 'max_latency': 0.0}
 
     def __call__(self, cache, key, args, kwargs, multi=False):
-        self.queue.appendleft((cache, key, args, kwargs, multi))
-
-    def pop(self):
-        try:
-            return self.queue.pop()
-        except IndexError:
-            pass
+        counters = self.counters
+        if multi:
+            okey = None
+            bkey = batch_key(cache, args, kwargs)
+        else:
+            okey = offload_key(cache, key, args, kwargs, multi)
+            bkey = None
+
+        with self.cond:
+            if bkey is not None:
+                batch = self.batches.get(bkey)
+                if batch is not None:
+                    # merged batch is capped by batch_size, the rest of
+                    # ids goes to a new batch
+                    key = [k for k in key if k not in batch]
+                    room = self.batch_size - len(batch)
+                    if room > 0:
+                        batch.update(key[:room])
+                        key = key[room:]
+                    if not key:
+                        counters['merged'] += 1
+                        return
+            elif okey is not None and okey in self.pending:
+                counters['deduplicated'] += 1
+                return
+
+            if len(self.queue) >= self.size:
+                counters['dropped'] += 1
+                return
+
+            if bkey is not None:
+                key = self.batches[bkey] = set(key)
+            elif okey is not None:
+                self.pending.add(okey)
+            counters['queued'] += 1
+            self.queue.appendleft((okey, bkey, time(), (cache, key, args, kwargs, multi)))
+            self.cond.notify()
+
+    def stats(self):
+        with self.cond:
+            result = dict(self.counters, queue_depth=len(self.queue))
+        processed = result['processed']
+        result['avg_latency'] = processed and result['latency'] / processed
+        return result
+
+    def process(self, okey, bkey, queued_at, item):
+        default_offload(*item)
+        latency = time() - queued_at
+        counters = self.counters
+        with self.cond:
+            self.pending.discard(okey)
+            counters['processed'] += 1
+            counters['latency'] += latency
+            if latency > counters['max_latency']:
+                counters['max_latency'] = latency
+
+    def take(self):
+        # Oldest ready entry. Batches still collecting ids during a window
+        # are skipped, so they do not block items queued after them.
+        queue = self.queue
+        now = time()
+        delay = None
+        for idx, entry in enumerate(reversed(queue)):
+            bkey, queued_at, ids = entry[1], entry[2], entry[3][1]
+            if bkey is not None and self.window and len(ids) < self.batch_size:
+                wait = queued_at + self.window - now
+                if wait > 0:
+                    if delay is None:
+                        delay = wait
+                    continue
+            del queue[len(queue) - 1 - idx]
+            if bkey is not None and self.batches.get(bkey) is ids:
+                del self.batches[bkey]
+            return entry, None
+        return None, delay
 
     def worker(self):
-        pop = self.pop
-        wait = None
+        cond = self.cond
+        queue = self.queue
         while True:
-            item = pop()
-            if item:
-                default_offload(*item)
-                wait = None
-            else:
-                if not wait:
-                    wait = iter([0.001, 0.01, 0.1, 0.5])
-                sleep(next(wait, 1))
+            with cond:
+                while True:
+                    while not queue:
+                        cond.wait()
+                    entry, delay = self.take()
+                    if entry is not None:
+                        break
+                    cond.wait(delay)
+            self.process(*entry)
+
+    def run_workers(self):
+        threads = []
+        for _ in range(self.workers):
+            t = Thread(target=self.worker)
+            t.daemon = True
+            t.start()
+            threads.append(t)
+        return threads
 
     def run(self):
-        t = Thread(target=self.worker)
-        t.daemon = True
-        t.start()
-        return t
+        # a single worker thread is returned as before workers option
+        threads = self.run_workers()
+        return threads[0] if len(threads) == 1 else threads
+
+
+SYNC_WRAPPERS = 'OffloadCacheWrapper', 'OffloadObjectsCacheWrapper'
+
+
+def __getattr__(name):
+    # sync wrappers are still importable from here, they are
+    # generated on first access to keep `import cachel` cheap
+    if name in SYNC_WRAPPERS:
+        return load_offload_wrappers(False, False, False)[name]
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+
+if not MODULE_GETATTR:  # pragma: no cover
+    _wrappers = load_offload_wrappers(False, False, False)
+    globals().update((name, _wrappers[name]) for name in SYNC_WRAPPERS)
+
+if ASYNC_AWAIT:  # pragma: no cover
+    from ._async_offload import AsyncOffloader
@@ -32,3 +32,9 @@ class RedisCache(object):
         for key, value in items:
             p.set(key, value, ttl)
         p.execute()
+
+    def mset_ttl(self, items):
+        p = self.client.pipeline(transaction=False)
+        for key, value, ttl in items:
+            p.set(key, value, ttl)
+        p.execute()
@@ -0,0 +1,102 @@
+from hashlib import md5
+from struct import unpack_from
+
+from .base import BaseCache
+from .compat import ASYNC_AWAIT, utype
+
+
+def jump_hash(key, buckets):
+    b, j = -1, 0
+    while j < buckets:
+        b = j
+        key = (key * 2862933555777941757 + 1) & 0xffffffffffffffff
+        j = int((b + 1) * float(1 << 31) / float((key >> 33) + 1))
+    return b
+
+
+try:  # pragma: no cover
+    from .jhash import jhash
+except ImportError:  # pragma: no cover
+    jhash = jump_hash
+
+
+def key_hash(key):
+    if type(key) is utype:
+        key = key.encode('utf-8')
+    return unpack_from('<Q', md5(key).digest())[0]
+
+
+class ShardRouter(object):
+    def __init__(self, caches):
+        self.caches = list(caches)
+
+    def get_shard(self, key):
+        return self.caches[jhash(key_hash(key), len(self.caches))]
+
+    def split(self, keys):
+        buckets = len(self.caches)
+        groups = {}
+        for pos, key in enumerate(keys):
+            idx = jhash(key_hash(key), buckets)
+            try:
+                group = groups[idx]
+            except KeyError:
+                group = groups[idx] = [], []
+            group[0].append(pos)
+            group[1].append(key)
+        return [(self.caches[idx], positions, skeys)
+                for idx, (positions, skeys) in groups.items()]
+
+    def split_items(self, items):
+        items = list(items)
+        return [(cache, [items[p] for p in positions])
+                for cache, positions, _ in self.split([it[0] for it in items])]
+
+
+class ShardedCache(ShardRouter, BaseCache):
+    def __init__(self, caches, max_workers=None):
+        # py2 has concurrent.futures only with the futures backport
+        from concurrent.futures import ThreadPoolExecutor
+        ShardRouter.__init__(self, caches)
+        self.executor = ThreadPoolExecutor(max_workers or len(self.caches))
+
+    def _run(self, calls):
+        if len(calls) == 1:
+            func, arg = calls[0]
+            return [func(*arg)]
+        futures = [self.executor.submit(func, *arg) for func, arg in calls]
+        return [it.result() for it in futures]
+
+    def get(self, key):
+        return self.get_shard(key).get(key)
+
+    def set(self, key, value, ttl):
+        self.get_shard(key).set(key, value, ttl)
+
+    def delete(self, key):
+        self.get_shard(key).delete(key)
+
+    def mget(self, keys):
+        groups = self.split(keys)
+        result = [None] * len(keys)
+        values = self._run([(cache.mget, (skeys,)) for cache, _, skeys in groups])
+        for (_, positions, _), svalues in zip(groups, values):
+            for pos, value in zip(positions, svalues):
+                result[pos] = value
+        return result
+
+    def mset(self, items, ttl):
+        self._run([(cache.mset, (sitems, ttl))
+                   for cache, sitems in self.split_items(items)])
+
+    def mset_ttl(self, items):
+        self._run([(cache.mset_ttl, (sitems,))
+                   for cache, sitems in self.split_items(items)])
+
+    def mdelete(self, keys):
+        self._run([(cache.mdelete, (skeys,))
+                   for cache, _, skeys in self.split(keys)])
+
+
+if ASYNC_AWAIT:  # pragma: no cover
+    from ._async_sharded import AsyncShardedCache
@@ -2,32 +2,120 @@ from functools import wraps
 
 from . import compat
 from .base import make_key_func, get_serializer, get_expire
+from . import flight as sflight
+from .stats import instrument
+from .chunked import chunked
+from .loader import batched
+from . import offload as soffload
 from .wrappers import load_wrappers
 
 
 class make_cache(object):
-    def __init__(self, cache, ttl=600, fmt='msgpack', fuzzy_ttl=True):
+    def __init__(self, cache, ttl=600, fmt='msgpack', fuzzy_ttl=True,
+                 single_flight=False, negative_ttl=None, early_refresh=None,
+                 stats=False, max_key_size=None, stale_ttl=None, offload=None):
         self.cache = cache
         self.ttl = ttl
         self.fmt = fmt
         self.fuzzy_ttl = fuzzy_ttl
+        self.single_flight = single_flight
+        self.negative_ttl = negative_ttl
+        self.early_refresh = early_refresh
+        self.stats = stats
+        self.max_key_size = max_key_size
+        self.stale_ttl = stale_ttl
+        self.offload = offload
+        self.async_offload = None
+        self.thread_offload = None
 
-    def _wrapper(self, tpl, ttl, fmt, fuzzy_ttl, multi=False):
+    def get_offload(self, async_call):
+        if self.offload:
+            return self.offload
+        if async_call:
+            if not self.async_offload:
+                self.async_offload = soffload.AsyncOffloader()
+            return self.async_offload
+        # inline refresh would delay a stale hit, so sync
+        # functions are refreshed by a background thread
+        if not self.thread_offload:
+            self.thread_offload = soffload.ThreadOffloader()
+            self.thread_offload.run()
+        return self.thread_offload
+
+    def _option(self, options, name):
+        value = options.get(name)
+        return getattr(self, name) if value is None else value
+
+    def _wrapper(self, tpl, options, multi=False):
         def decorator(func):
-            m = load_wrappers(
-                compat.iscoroutinefunction(func),
-                getattr(self.cache, 'is_async', False))
-            cls = m['ObjectsCacheWrapper'] if multi else m['CacheWrapper']
-            fttl = self.fuzzy_ttl if fuzzy_ttl is None else fuzzy_ttl
-            return wraps(func)(cls(
-                func, self.cache,
-                make_key_func(tpl, func, multi),
-                get_serializer(fmt or self.fmt),
-                get_expire(ttl or self.ttl, fttl)))
+            option = lambda name: self._option(options, name)
+            async_fn = compat.iscoroutinefunction(func)
+            async_cache = getattr(self.cache, 'is_async', False)
+            m = load_wrappers(async_fn, async_cache)
+            beta = None if multi else option('early_refresh')
+            stale_ttl = None if multi else option('stale_ttl')
+            if beta and stale_ttl:
+                raise Exception('early_refresh and stale_ttl can not be used together')
+
+            offload = None
+            if multi:
+                cls = m['ObjectsCacheWrapper']
+            elif stale_ttl:
+                cls = m['StaleCacheWrapper']
+                offload = self.get_offload(async_fn or async_cache)
+            elif beta:
+                cls = m['XFetchCacheWrapper']
+            else:
+                cls = m['CacheWrapper']
+
+            flight = None
+            if option('single_flight'):
+                if async_fn or async_cache:
+                    flight = sflight.AsyncSingleFlight()
+                else:
+                    flight = sflight.SingleFlight()
+
+            cache = self.cache
+            if options.get('chunk_size'):
+                cache = chunked(cache, options['chunk_size'],
+                                options.get('concurrency') or 4)
+
+            wrapper = cls(
+                func, cache,
+                make_key_func(tpl, func, multi, option('max_key_size'),
+                              options.get('key_spec')),
+                get_serializer(options.get('fmt') or self.fmt),
+                get_expire(options.get('ttl') or self.ttl, option('fuzzy_ttl')),
+                flight,
+                option('negative_ttl'),
+                beta,
+                stale_ttl,
+                offload)
+
+            if multi and options.get('auto_batch'):
+                if not (async_fn or async_cache):
+                    raise Exception('auto_batch requires async function or cache')
+                wrapper = batched(wrapper)
+
+            if option('stats'):
+                wrapper = instrument(wrapper, multi)
+            return wraps(func)(wrapper)
         return decorator
 
-    def __call__(self, tpl, ttl=None, fmt=None, fuzzy_ttl=None):
-        return self._wrapper(tpl, ttl, fmt, fuzzy_ttl)
+    def __call__(self, tpl, ttl=None, fmt=None, fuzzy_ttl=None, single_flight=None,
+                 early_refresh=None, stats=None, max_key_size=None, key_spec=None,
+                 stale_ttl=None):
+        return self._wrapper(tpl, dict(
+            ttl=ttl, fmt=fmt, fuzzy_ttl=fuzzy_ttl, single_flight=single_flight,
+            early_refresh=early_refresh, stats=stats, max_key_size=max_key_size,
+            key_spec=key_spec, stale_ttl=stale_ttl))
 
-    def objects(self, tpl, ttl=None, fmt=None, fuzzy_ttl=None):
-        return self._wrapper(tpl, ttl, fmt, fuzzy_ttl, multi=True)
+    def objects(self, tpl, ttl=None, fmt=None, fuzzy_ttl=None, single_flight=None,
+                negative_ttl=None, stats=None, max_key_size=None, key_spec=None,
+                chunk_size=None, concurrency=None, auto_batch=None):
+        return self._wrapper(tpl, dict(
+            ttl=ttl, fmt=fmt, fuzzy_ttl=fuzzy_ttl, single_flight=single_flight,
+            negative_ttl=negative_ttl, stats=stats, max_key_size=max_key_size,
+            key_spec=key_spec, chunk_size=chunk_size, concurrency=concurrency,
+            auto_batch=auto_batch),
+            multi=True)
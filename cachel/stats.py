@@ -0,0 +1,204 @@
+from functools import wraps
+from threading import Lock
+
+try:  # pragma: no cover
+    from time import perf_counter as clock
+except ImportError:  # pragma: no cover py2
+    from time import time as clock
+
+from . import compat
+
+REGISTRY = {}
+COUNTERS = ('calls', 'requests', 'misses', 'stale', 'offloads', 'refreshes',
+            'batch_size_sum')
+GAUGES = ('batch_size_max',)
+TIMERS = ('keyfunc', 'dumps', 'loads', 'backend', 'func')
+CACHE_METHODS = ('get', 'mget', 'set', 'mset', 'mset_ttl', 'delete', 'mdelete')
+
+
+class Stats(object):
+    def __init__(self, name):
+        self.name = name
+        self.counters = dict.fromkeys(COUNTERS + GAUGES, 0)
+        self.timers = {it: [0, 0.0] for it in TIMERS}
+        # wrappers are called from many threads, offloader workers included
+        self.lock = Lock()
+
+    def incr(self, name, value=1):
+        with self.lock:
+            self.counters[name] += value
+
+    def call(self, size, batch=False):
+        counters = self.counters
+        with self.lock:
+            counters['calls'] += 1
+            counters['requests'] += size
+            if batch:
+                counters['batch_size_sum'] += size
+                if size > counters['batch_size_max']:
+                    counters['batch_size_max'] = size
+
+    def snapshot(self):
+        with self.lock:
+            result = dict(self.counters)
+            timers = {name: {'count': count, 'total': total}
+                      for name, (count, total) in compat.iteritems(self.timers)}
+        result['misses'] -= result['refreshes']
+        result['hits'] = result['requests'] - result['misses']
+        result['timers'] = timers
+        return result
+
+
+def timed(func, timer, lock):
+    def inner(*args, **kwargs):
+        start = clock()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = clock() - start
+            with lock:
+                timer[0] += 1
+                timer[1] += elapsed
+    return inner
+
+
+def counted_func(func, stats, multi):
+    if compat.iscoroutinefunction(func):
+        inner = async_timed(func, stats.timers['func'], stats.lock)
+    else:
+        inner = timed(func, stats.timers['func'], stats.lock)
+
+    @wraps(func)
+    def counted(*args, **kwargs):
+        stats.incr('misses', len(args[0]) if multi else 1)
+        return inner(*args, **kwargs)
+    return counted
+
+
+def counted_warm(warm_chunk, stats):
+    def inner(ids, args, kwargs):
+        stats.incr('requests', len(ids))
+        return warm_chunk(ids, args, kwargs)
+    return inner
+
+
+def counted_offload(offload, stats):
+    counters = stats.counters
+
+    def inner(cache, key, args, kwargs, multi=False):
+        with stats.lock:
+            counters['stale'] += len(key) if multi else 1
+            counters['offloads'] += 1
+        return offload(cache, key, args, kwargs, multi)
+    return inner
+
+
+class TimedCache(object):
+    def __init__(self, cache, timer, lock):
+        self.origin = cache
+        self.is_async = getattr(cache, 'is_async', False)
+        wrap = async_timed if self.is_async else timed
+        for name in CACHE_METHODS:
+            method = getattr(cache, name, None)
+            if method is not None:
+                setattr(self, name, wrap(method, timer, lock))
+
+    def __getattr__(self, name):
+        return getattr(self.origin, name)
+
+
+class StatsMixin(object):
+    def __call__(self, *args, **kwargs):
+        self.stats.call(1)
+        return super(StatsMixin, self).__call__(*args, **kwargs)
+
+    def refresh(self, key, args, kwargs):
+        self.stats.incr('refreshes')
+        return super(StatsMixin, self).refresh(key, args, kwargs)
+
+
+class ObjectsStatsMixin(StatsMixin):
+    def __call__(self, ids, *args, **kwargs):
+        if not isinstance(ids, (list, tuple)):
+            ids = list(ids)
+        self.stats.call(len(ids), batch=True)
+        return super(StatsMixin, self).__call__(ids, *args, **kwargs)
+
+    def refresh(self, ids, args, kwargs):
+        self.stats.incr('refreshes', len(ids))
+        return super(StatsMixin, self).refresh(ids, args, kwargs)
+
+
+_classes = {}
+
+
+def instrumented_class(cls, multi):
+    try:
+        return _classes[cls]
+    except KeyError:
+        pass
+    mixin = ObjectsStatsMixin if multi else StatsMixin
+    result = _classes[cls] = type(cls.__name__, (mixin, cls), {})
+    return result
+
+
+def instrument(wrapper, multi=False, name=None):
+    name = name or '{}.{}'.format(wrapper.func.__module__, wrapper.func.__name__)
+    stats = REGISTRY[name] = Stats(name)
+    timers = stats.timers
+    lock = stats.lock
+
+    wrapper.stats = stats
+    wrapper.keyfunc = timed(wrapper.keyfunc, timers['keyfunc'], lock)
+    wrapper.dumps = timed(wrapper.dumps, timers['dumps'], lock)
+    wrapper.loads = timed(wrapper.loads, timers['loads'], lock)
+    wrapper.loads_many = timed(wrapper.loads_many, timers['loads'], lock)
+    wrapper.func = counted_func(wrapper.func, stats, multi)
+    for attr in ('cache', 'cache1', 'cache2'):
+        cache = getattr(wrapper, attr, None)
+        if cache is not None:
+            setattr(wrapper, attr, TimedCache(cache, timers['backend'], lock))
+    if getattr(wrapper, 'offload', None) is not None:
+        wrapper.offload = counted_offload(wrapper.offload, stats)
+    if multi:
+        # warmed ids are requests too, otherwise their misses make hits negative
+        wrapper.warm_chunk = counted_warm(wrapper.warm_chunk, stats)
+
+    wrapper.__class__ = instrumented_class(type(wrapper), multi)
+    return wrapper
+
+
+def snapshot():
+    return {name: stats.snapshot() for name, stats in compat.iteritems(REGISTRY)}
+
+
+def prometheus(snapshots):
+    lines = []
+    for counter in COUNTERS + ('hits',):
+        lines.append('# TYPE cachel_{}_total counter'.format(counter))
+        for name, data in sorted(compat.iteritems(snapshots)):
+            lines.append('cachel_{}_total{{cache="{}"}} {}'.format(counter, name, data[counter]))
+
+    for gauge in GAUGES:
+        lines.append('# TYPE cachel_{} gauge'.format(gauge))
+        for name, data in sorted(compat.iteritems(snapshots)):
+            lines.append('cachel_{}{{cache="{}"}} {}'.format(gauge, name, data[gauge]))
+
+    for metric, field in (('ops', 'count'), ('seconds', 'total')):
+        lines.append('# TYPE cachel_{}_total counter'.format(metric))
+        for name, data in sorted(compat.iteritems(snapshots)):
+            for op, timer in sorted(compat.iteritems(data['timers'])):
+                lines.append('cachel_{}_total{{cache="{}",op="{}"}} {}'.format(
+                    metric, name, op, timer[field]))
+
+    return '\n'.join(lines) + '\n'
+
+
+def export(exporter=prometheus):
+    return exporter(snapshot())
+
+
+if compat.ASYNC_AWAIT:  # pragma: no cover
+    from ._async_stats import async_timed
+else:  # pragma: no cover
+    async_timed = timed
@@ -0,0 +1,64 @@
+from .base import BaseCache
+from .compat import ASYNC_AWAIT
+from .memory import MemoryCache
+
+
+class BaseTieredCache(object):
+    def __init__(self, l1, l2, l1_ttl=5, l1_size=10000):
+        self.l1 = MemoryCache(max_items=l1_size) if l1 is None else l1
+        self.l2 = l2
+        self.l1_ttl = l1_ttl
+
+    def get_l1_ttl(self, ttl):
+        return min(ttl, self.l1_ttl) if ttl else self.l1_ttl
+
+
+class TieredCache(BaseTieredCache, BaseCache):
+    def get(self, key):
+        value = self.l1.get(key)
+        if value is None:
+            value = self.l2.get(key)
+            if value is not None:
+                self.l1.set(key, value, self.l1_ttl)
+        return value
+
+    def mget(self, keys):
+        values = self.l1.mget(keys)
+        missing = [idx for idx, value in enumerate(values) if value is None]
+        if missing:
+            to_fill = []
+            l2_values = self.l2.mget([keys[idx] for idx in missing])
+            for idx, value in zip(missing, l2_values):
+                if value is not None:
+                    values[idx] = value
+                    to_fill.append((keys[idx], value))
+            if to_fill:
+                self.l1.mset(to_fill, self.l1_ttl)
+        return values
+
+    def set(self, key, value, ttl):
+        self.l2.set(key, value, ttl)
+        self.l1.set(key, value, self.get_l1_ttl(ttl))
+
+    def mset(self, items, ttl):
+        items = list(items)
+        self.l2.mset(items, ttl)
+        self.l1.mset(items, self.get_l1_ttl(ttl))
+
+    def mset_ttl(self, items):
+        items = list(items)
+        self.l2.mset_ttl(items)
+        l1_ttl = self.get_l1_ttl
+        self.l1.mset_ttl([(k, v, l1_ttl(ttl)) for k, v, ttl in items])
+
+    def delete(self, key):
+        self.l1.delete(key)
+        self.l2.delete(key)
+
+    def mdelete(self, keys):
+        self.l1.mdelete(keys)
+        self.l2.mdelete(keys)
+
+
+if ASYNC_AWAIT:  # pragma: no cover
+    from ._async_tiered import AsyncTieredCache
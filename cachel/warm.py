@@ -0,0 +1,62 @@
+from collections import deque
+
+from .compat import ASYNC_AWAIT, iscoroutinefunction
+
+
+def iter_chunks(ids, size):
+    chunk = []
+    for oid in ids:
+        chunk.append(oid)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def warm(wrapper, ids, args, kwargs):
+    chunk_size = kwargs.pop('chunk_size', 1000)
+    concurrency = kwargs.pop('concurrency', 1)
+    progress = kwargs.pop('progress', None)
+    # instance level warm_chunk can be wrapped by stats
+    if iscoroutinefunction(type(wrapper).warm_chunk):
+        return async_warm(wrapper, ids, args, kwargs, chunk_size, concurrency, progress)
+
+    processed = fetched = 0
+    if concurrency <= 1:
+        for chunk in iter_chunks(ids, chunk_size):
+            missing = wrapper.warm_chunk(chunk, args, kwargs)
+            processed += len(chunk)
+            fetched += len(missing)
+            if progress:
+                progress(processed, fetched)
+        return processed, fetched
+
+    from concurrent.futures import ThreadPoolExecutor
+    executor = ThreadPoolExecutor(concurrency)
+    pending = deque()
+    chunks = iter_chunks(ids, chunk_size)
+    try:
+        while True:
+            # keep at most `concurrency` chunks in flight so
+            # ids are consumed from the iterable lazily
+            for chunk in chunks:
+                pending.append((chunk, executor.submit(
+                    wrapper.warm_chunk, chunk, args, kwargs)))
+                if len(pending) >= concurrency:
+                    break
+            if not pending:
+                break
+            chunk, future = pending.popleft()
+            missing = future.result()
+            processed += len(chunk)
+            fetched += len(missing)
+            if progress:
+                progress(processed, fetched)
+    finally:
+        executor.shutdown(wait=True)
+    return processed, fetched
+
+
+if ASYNC_AWAIT:  # pragma: no cover
+    from ._async_warm import async_warm
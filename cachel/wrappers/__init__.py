@@ -1,15 +1,51 @@
-from cachel.compat import iteritems
-from cachel.base import _Expire
+from itertools import product
+from threading import Lock
+
+from cachel.compat import iteritems, ASYNC_AWAIT
+from cachel.base import _Expire, get_loads_many
 from cachel.ast_transformer import execute
 
 
 class BaseCacheWrapper(object):
-    def __init__(self, func, cache, keyfunc, serializer, ttl):
+    max_refreshing = 10000
+
+    def __init__(self, func, cache, keyfunc, serializer, ttl, flight=None,
+                 negative_ttl=None, beta=None, stale_ttl=None, offload=None):
+        self.id = '{}.{}'.format(func.__module__, getattr(func, '__name__', None))
         self.func = func
         self.cache = cache
         self.keyfunc = keyfunc
         self.dumps, self.loads = serializer
+        self.loads_many = get_loads_many(serializer)
         self.ttl = ttl
+        self.flight = flight
+        self.negative_ttl = negative_ttl
+        self.beta = beta
+        self.has_mset_ttl = getattr(cache, 'mset_ttl', None) is not None
+        self.stale_ttl = stale_ttl
+        self.offload = offload
+        self.refreshing = {}
+        self.refresh_lock = Lock()
+
+    def start_refresh(self, key, now):
+        refreshing = self.refreshing
+        with self.refresh_lock:
+            if refreshing.get(key, 0) > now:
+                return False
+            if len(refreshing) >= self.max_refreshing:
+                # offloader can drop refresh requests and marks are never
+                # popped then, so expired ones are purged and the oldest
+                # are evicted to keep the map bounded
+                for k in [k for k, v in iteritems(refreshing) if v <= now]:
+                    del refreshing[k]
+                keep = self.max_refreshing // 2
+                if len(refreshing) > keep:
+                    for k in list(refreshing)[:len(refreshing) - keep]:
+                        del refreshing[k]
+            # refresh could be done by another process, so
+            # in-flight mark is only valid during ttl
+            refreshing[key] = now + self.ttl
+        return True
 
 
 def agg_expire(result, default_ttl):
@@ -31,3 +67,17 @@ def agg_expire(result, default_ttl):
 def load_wrappers(async_fn, async_cache):
     params = ('fn', async_fn), ('cache', async_cache), ('call', async_cache or async_fn)
     return execute('cachel.wrappers.wrappers_t', params)
+
+
+def load_offload_wrappers(async_fn, async_cache1, async_cache2):
+    params = (('fn', async_fn), ('cache1', async_cache1), ('cache2', async_cache2),
+              ('call', async_fn or async_cache1 or async_cache2))
+    return execute('cachel.wrappers.offload_t', params)
+
+
+def precompile():
+    flags = (False, True) if ASYNC_AWAIT else (False,)
+    for async_fn, async_cache in product(flags, repeat=2):
+        load_wrappers(async_fn, async_cache)
+    for async_fn, async_cache1, async_cache2 in product(flags, repeat=3):
+        load_offload_wrappers(async_fn, async_cache1, async_cache2)
@@ -0,0 +1,165 @@
+from cachel.compat import listitems
+from cachel.base import TOMBSTONE
+from cachel.offload import BaseOffloadCacheWrapper
+from cachel.warm import warm
+
+__await__cache1 = __await__cache2 = __await__fn = __await__call = None
+__async__call = __async__cache2 = None
+
+
+class OffloadCacheWrapper(BaseOffloadCacheWrapper):
+    def __call__(__async__call, self, *args, **kwargs):
+        k = self.keyfunc(*args, **kwargs)
+        result = __await__cache1(self.cache1.get(k))
+        if result is None:
+            result = __await__cache2(self.cache2.get(k))
+            if result is None:
+                return __await__call(self._fetch(k, args, kwargs))
+            else:
+                expire, result = self.loads2(result)
+                __await__cache1(self.cache1.set(k, result, self.ttl1))
+                if self.now() > expire:
+                    self.offload(self, k, args, kwargs)
+                return self.loads(result)
+        else:
+            return self.loads(result)
+
+    def refresh(__async__call, self, key, args, kwargs):
+        return __await__call(self._fetch(key, args, kwargs))
+
+    def _fetch(__async__call, self, key, args, kwargs):
+        result = __await__fn(self.func(*args, **kwargs))
+        sdata = self.dumps(result)
+        __await__cache1(self.cache1.set(key, sdata, self.ttl1))
+        __await__cache2(self.cache2.set(key, self.dumps2(sdata), self.ttl2))
+        return result
+
+    def get(__async__cache2, self, *args, **kwargs):
+        k = self.keyfunc(*args, **kwargs)
+        result = __await__cache2(self.cache2.get(k))
+        if result:
+            return self.loads(self.loads2(result)[1])
+
+    def set(__async__cache2, self, value, *args, **kwargs):
+        k = self.keyfunc(*args, **kwargs)
+        __await__cache2(self.cache2.set(k, self.dumps2(self.dumps(value)), self.ttl2))
+
+    def invalidate(__async__cache2, self, *args, **kwargs):
+        key = self.keyfunc(*args, **kwargs)
+        __await__cache2(self.cache2.delete(key))
+
+
+class OffloadObjectsCacheWrapper(OffloadCacheWrapper):
+    def __call__(__async__call, self, ids, *args, **kwargs):
+        if not isinstance(ids, (list, tuple)):
+            ids = list(ids)
+
+        loads2 = self.loads2
+        now = self.now()
+
+        keys = self.keyfunc(ids, *args, **kwargs)
+        cresult = {}
+        negative = set()
+        if keys:
+            found_ids = []
+            found = []
+            for oid, value in zip(ids, __await__cache1(self.cache1.mget(keys))):
+                if value is not None:
+                    if value == TOMBSTONE:
+                        negative.add(oid)
+                    else:
+                        found_ids.append(oid)
+                        found.append(value)
+            if found:
+                cresult = dict(zip(found_ids, self.loads_many(found)))
+
+        c2_ids_to_fetch = list(set(ids) - set(cresult) - negative)
+        c2_keys = self.keyfunc(c2_ids_to_fetch, *args, **kwargs)
+        c2_result = {}
+        offload_ids = []
+        update_data = []
+        update_negative = []
+        if c2_ids_to_fetch:
+            found_ids = []
+            found = []
+            for key, oid, value in zip(c2_keys, c2_ids_to_fetch,
+                                       __await__cache2(self.cache2.mget(c2_keys))):
+                if value is not None:
+                    expire, data = loads2(value)
+                    if now > expire:
+                        offload_ids.append(oid)
+                    if data == TOMBSTONE:
+                        negative.add(oid)
+                        update_negative.append((key, data))
+                    else:
+                        update_data.append((key, data))
+                        found_ids.append(oid)
+                        found.append(data)
+            if found:
+                c2_result = dict(zip(found_ids, self.loads_many(found)))
+                cresult.update(c2_result)
+
+        if update_data:
+            __await__cache1(self.cache1.mset(update_data, self.ttl1))
+        if update_negative:
+            __await__cache1(self.cache1.mset(
+                update_negative, min(self.ttl1, self.negative_ttl or self.ttl1)))
+
+        if offload_ids:
+            self.offload(self, offload_ids, args, kwargs, multi=True)
+
+        ids_to_fetch = set(c2_ids_to_fetch) - set(c2_result) - negative
+        if ids_to_fetch:
+            fresult = __await__call(self._get_func_result(ids_to_fetch, args, kwargs, now))
+            cresult.update(fresult)
+
+        return cresult
+
+    def refresh(__async__call, self, ids, args, kwargs):
+        return __await__call(self._get_func_result(ids, args, kwargs))
+
+    def _get_func_result(__async__call, self, ids, args, kwargs, now=None):
+        now = now or self.now()
+        dumps = self.dumps
+        dumps2 = self.dumps2
+        fresult = __await__fn(self.func(ids, *args, **kwargs))
+        if fresult:
+            to_cache_pairs = listitems(fresult)
+            to_cache_ids, to_cache_values = zip(*to_cache_pairs)
+            keys = self.keyfunc(to_cache_ids, *args, **kwargs)
+            values = [dumps(r) for r in to_cache_values]
+            evalues = [dumps2(r, now) for r in values]
+            __await__cache1(self.cache1.mset(zip(keys, values), self.ttl1))
+            __await__cache2(self.cache2.mset(zip(keys, evalues), self.ttl2))
+
+        nonexisting_ids = set(ids) - set(fresult)
+        if nonexisting_ids and self.negative_ttl:
+            keys = self.keyfunc(list(nonexisting_ids), *args, **kwargs)
+            nttl = self.negative_ttl
+            __await__cache1(self.cache1.mset([(k, TOMBSTONE) for k in keys],
+                                             min(self.ttl1, nttl)))
+            tombstone = dumps2(TOMBSTONE, now)
+            __await__cache2(self.cache2.mset([(k, tombstone) for k in keys], nttl))
+        elif nonexisting_ids:
+            __await__cache2(self.invalidate(nonexisting_ids, *args, **kwargs))
+
+        return fresult
+
+    def warm(self, ids, *args, **kwargs):
+        return warm(self, ids, args, kwargs)
+
+    def warm_chunk(__async__call, self, ids, args, kwargs):
+        keys = self.keyfunc(ids, *args, **kwargs)
+        values = __await__cache2(self.cache2.mget(keys))
+        missing = [oid for oid, value in zip(ids, values) if value is None]
+        if missing:
+            __await__call(self._get_func_result(missing, args, kwargs))
+        return missing
+
+    def one(__async__call, self, id, *args, **kwargs):
+        default = kwargs.pop('_default', None)
+        return __await__call(self([id], *args, **kwargs)).get(id, default)
+
+    def invalidate(__async__cache2, self, ids, *args, **kwargs):
+        keys = self.keyfunc(ids, *args, **kwargs)
+        __await__cache2(self.cache2.mdelete(keys))
@@ -1,6 +1,12 @@
+from math import log
+from random import random
+from time import time
+
 from cachel.compat import iteritems
-from cachel.base import _Expire
+from cachel.base import _Expire, TOMBSTONE
+from cachel.envelope import pack, unpack
 from cachel.wrappers import BaseCacheWrapper, agg_expire
+from cachel.warm import warm
 
 __await__cache = __await__fn = __await__call = __async__call = __async__cache = None
 
@@ -10,16 +16,21 @@ class CacheWrapper(BaseCacheWrapper):
         k = self.keyfunc(*args, **kwargs)
         result = __await__cache(self.cache.get(k))
         if result is None:
-            result = __await__fn(self.func(*args, **kwargs))
-            if type(result) is _Expire:
-                result, ttl = result
-            else:
-                ttl = self.ttl
-            __await__cache(self.cache.set(k, self.dumps(result), ttl))
-            return result
+            if self.flight is None:
+                return __await__call(self._fetch(k, args, kwargs))
+            return __await__call(self.flight(k, self._fetch, k, args, kwargs))
         else:
             return self.loads(result)
 
+    def _fetch(__async__call, self, k, args, kwargs):
+        result = __await__fn(self.func(*args, **kwargs))
+        if type(result) is _Expire:
+            result, ttl = result
+        else:
+            ttl = self.ttl
+        __await__cache(self.cache.set(k, self.dumps(result), ttl))
+        return result
+
     def get(__async__cache, self, *args, **kwargs):
         k = self.keyfunc(*args, **kwargs)
         result = __await__cache(self.cache.get(k))
@@ -35,39 +46,183 @@ class CacheWrapper(BaseCacheWrapper):
         __await__cache(self.cache.delete(key))
 
 
+class XFetchCacheWrapper(CacheWrapper):
+    def __call__(__async__call, self, *args, **kwargs):
+        k = self.keyfunc(*args, **kwargs)
+        result = __await__cache(self.cache.get(k))
+        envelope = result and unpack(result)
+        if envelope:
+            expire, delta, data = envelope
+            if time() - delta * self.beta * log(1.0 - random()) < expire:
+                return self.loads(data)
+
+        if self.flight is None:
+            return __await__call(self._fetch(k, args, kwargs))
+        return __await__call(self.flight(k, self._fetch, k, args, kwargs))
+
+    def _fetch(__async__call, self, k, args, kwargs):
+        start = time()
+        result = __await__fn(self.func(*args, **kwargs))
+        if type(result) is _Expire:
+            result, ttl = result
+        else:
+            ttl = self.ttl
+        now = time()
+        data = pack(self.dumps(result), now + ttl, now - start)
+        __await__cache(self.cache.set(k, data, ttl))
+        return result
+
+    def get(__async__cache, self, *args, **kwargs):
+        k = self.keyfunc(*args, **kwargs)
+        result = __await__cache(self.cache.get(k))
+        envelope = result and unpack(result)
+        if envelope:
+            return self.loads(envelope[2])
+
+    def set(__async__cache, self, value, *args, **kwargs):
+        k = self.keyfunc(*args, **kwargs)
+        data = pack(self.dumps(value), time() + self.ttl)
+        __await__cache(self.cache.set(k, data, self.ttl))
+
+
+class StaleCacheWrapper(CacheWrapper):
+    def __call__(__async__call, self, *args, **kwargs):
+        k = self.keyfunc(*args, **kwargs)
+        result = __await__cache(self.cache.get(k))
+        envelope = result and unpack(result)
+        if envelope:
+            expire, _, data = envelope
+            now = time()
+            if now > expire and self.start_refresh(k, now):
+                self.offload(self, k, args, kwargs)
+            return self.loads(data)
+
+        if self.flight is None:
+            return __await__call(self._fetch(k, args, kwargs))
+        return __await__call(self.flight(k, self._fetch, k, args, kwargs))
+
+    def refresh(__async__call, self, key, args, kwargs):
+        try:
+            return __await__call(self._fetch(key, args, kwargs))
+        finally:
+            self.refreshing.pop(key, None)
+
+    def _fetch(__async__call, self, k, args, kwargs):
+        result = __await__fn(self.func(*args, **kwargs))
+        if type(result) is _Expire:
+            result, ttl = result
+        else:
+            ttl = self.ttl
+        data = pack(self.dumps(result), time() + ttl)
+        __await__cache(self.cache.set(k, data, ttl + self.stale_ttl))
+        return result
+
+    def get(__async__cache, self, *args, **kwargs):
+        k = self.keyfunc(*args, **kwargs)
+        result = __await__cache(self.cache.get(k))
+        envelope = result and unpack(result)
+        if envelope:
+            return self.loads(envelope[2])
+
+    def set(__async__cache, self, value, *args, **kwargs):
+        k = self.keyfunc(*args, **kwargs)
+        data = pack(self.dumps(value), time() + self.ttl)
+        __await__cache(self.cache.set(k, data, self.ttl + self.stale_ttl))
+
+
 class ObjectsCacheWrapper(CacheWrapper):
     def __call__(__async__call, self, ids, *args, **kwargs):
         if not isinstance(ids, (list, tuple)):
             ids = list(ids)
 
-        dumps = self.dumps
-        loads = self.loads
-
         keys = self.keyfunc(ids, *args, **kwargs)
         cresult = {}
+        negative = []
         if keys:
+            found_ids = []
+            found = []
             for oid, value in zip(ids, __await__cache(self.cache.mget(keys))):
                 if value is not None:
-                    cresult[oid] = loads(value)
+                    if value == TOMBSTONE:
+                        negative.append(oid)
+                    else:
+                        found_ids.append(oid)
+                        found.append(value)
+            if found:
+                cresult = dict(zip(found_ids, self.loads_many(found)))
 
         ids_to_fetch = set(ids) - set(cresult)
+        if negative:
+            ids_to_fetch.difference_update(negative)
         if ids_to_fetch:
-            fresult = __await__fn(self.func(ids_to_fetch, *args, **kwargs))
-            if fresult:
-                agg_result = iteritems(agg_expire(fresult, self.ttl))
-                for ttl, result in agg_result:
-                    to_cache_ids, to_cache_values = zip(*iteritems(result))
-                    keys = self.keyfunc(to_cache_ids, *args, **kwargs)
-                    values = [dumps(it) for it in to_cache_values]
-                    __await__cache(self.cache.mset(zip(keys, values), ttl))
-                    cresult.update(result)
+            if self.flight is None:
+                fresult = __await__call(self._fetch(ids_to_fetch, args, kwargs))
+            else:
+                keys = self.keyfunc(list(ids_to_fetch), *args, **kwargs)
+                fresult = __await__call(self.flight.multi(
+                    keys, ids_to_fetch, self._fetch, args, kwargs))
+            cresult.update(fresult)
 
         return cresult
 
+    def _fetch(__async__call, self, ids, args, kwargs):
+        dumps = self.dumps
+        cresult = {}
+        fresult = __await__fn(self.func(ids, *args, **kwargs)) or {}
+        missing = self.negative_ttl and [it for it in ids if it not in fresult]
+        if self.has_mset_ttl:
+            ttl = self.ttl
+            to_cache = []
+            for oid, value in iteritems(fresult):
+                if type(value) is _Expire:
+                    value, vttl = value
+                else:
+                    vttl = ttl
+                cresult[oid] = value
+                to_cache.append((oid, dumps(value), vttl))
+            if missing:
+                nttl = self.negative_ttl
+                to_cache.extend((oid, TOMBSTONE, nttl) for oid in missing)
+            if to_cache:
+                to_cache_ids, values, ttls = zip(*to_cache)
+                keys = self.keyfunc(to_cache_ids, *args, **kwargs)
+                __await__cache(self.cache.mset_ttl(zip(keys, values, ttls)))
+            return cresult
+
+        if fresult:
+            agg_result = iteritems(agg_expire(fresult, self.ttl))
+            for ttl, result in agg_result:
+                to_cache_ids, to_cache_values = zip(*iteritems(result))
+                keys = self.keyfunc(to_cache_ids, *args, **kwargs)
+                values = [dumps(it) for it in to_cache_values]
+                __await__cache(self.cache.mset(zip(keys, values), ttl))
+                cresult.update(result)
+        if missing:
+            keys = self.keyfunc(missing, *args, **kwargs)
+            __await__cache(self.cache.mset(
+                [(k, TOMBSTONE) for k in keys], self.negative_ttl))
+        return cresult
+
     def invalidate(__async__cache, self, ids, *args, **kwargs):
         keys = self.keyfunc(ids, *args, **kwargs)
         __await__cache(self.cache.mdelete(keys))
 
+    def warm(self, ids, *args, **kwargs):
+        return warm(self, ids, args, kwargs)
+
+    def warm_chunk(__async__call, self, ids, args, kwargs):
+        keys = self.keyfunc(ids, *args, **kwargs)
+        values = __await__cache(self.cache.mget(keys))
+        missing = [oid for oid, value in zip(ids, values) if value is None]
+        if not missing:
+            return missing
+        if self.flight is None:
+            __await__call(self._fetch(missing, args, kwargs))
+        else:
+            mkeys = [k for k, value in zip(keys, values) if value is None]
+            __await__call(self.flight.multi(mkeys, missing, self._fetch, args, kwargs))
+        return missing
+
     def one(__async__call, self, id, *args, **kwargs):
         default = kwargs.pop('_default', None)
         return __await__call(self([id], *args, **kwargs)).get(id, default)
@@ -0,0 +1,88 @@
+import pytest
+from cachel.aioredis import AsyncRedisCache
+
+
+class Pipeline(object):
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    def set(self, key, value, ex=None):
+        self.commands.append(('SET', key, value, ex))
+        return self
+
+    async def execute(self):
+        self.client.log.append(self.commands)
+        for _, key, value, ex in self.commands:
+            self.client.data[key] = value, ex
+
+
+class Redis(object):
+    def __init__(self):
+        self.data = {}
+        self.log = []
+
+    def pipeline(self, transaction=True):
+        assert not transaction
+        return Pipeline(self)
+
+    async def get(self, key):
+        self.log.append(('GET', key))
+        return self.data.get(key, (None,))[0]
+
+    async def mget(self, keys):
+        self.log.append(('MGET',) + tuple(keys))
+        return [self.data.get(k, (None,))[0] for k in keys]
+
+    async def set(self, key, value, ex=None):
+        self.log.append(('SET', key, value, ex))
+        self.data[key] = value, ex
+
+    async def delete(self, *keys):
+        self.log.append(('DEL',) + keys)
+        for k in keys:
+            self.data.pop(k, None)
+
+    async def unlink(self, *keys):
+        self.log.append(('UNLINK',) + keys)
+        for k in keys:
+            self.data.pop(k, None)
+
+
+@pytest.mark.asyncio
+async def test_aioredis():
+    client = Redis()
+    c = AsyncRedisCache(client=client)
+    assert await c.get('key1') is None
+
+    await c.set('key1', b'value', 10)
+    assert await c.get('key1') == b'value'
+    assert client.data['key1'] == (b'value', 10)
+
+    del client.log[:]
+    await c.mset({'key1': b'value1', 'key2': b'value2'}.items(), 20)
+    assert await c.mget(['key2', 'key1']) == [b'value2', b'value1']
+    assert client.log == [[('SET', 'key1', b'value1', 20), ('SET', 'key2', b'value2', 20)],
+                          ('MGET', 'key2', 'key1')]
+
+    del client.log[:]
+    await c.mset_ttl([('key1', b'value3', 30), ('key2', b'value4', 40)])
+    assert client.log == [[('SET', 'key1', b'value3', 30), ('SET', 'key2', b'value4', 40)]]
+
+    await c.delete('key1')
+    assert await c.get('key1') is None
+
+    del client.log[:]
+    await c.mdelete([])
+    await c.mdelete(['key1', 'key2'])
+    assert client.log == [('DEL', 'key1', 'key2')]
+
+    c = AsyncRedisCache(client=client, unlink=True)
+    await c.mdelete(['key1'])
+    assert client.log[-1] == ('UNLINK', 'key1')
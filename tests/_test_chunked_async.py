@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+from cachel.chunked import AsyncChunkedCache, chunked
+from cachel.simple import make_cache
+from .helpers import AsyncCache
+
+
+class SlowCache(AsyncCache):
+    def __init__(self):
+        AsyncCache.__init__(self)
+        self.active = 0
+        self.max_active = 0
+        self.calls = []
+
+    async def mget(self, keys):
+        self.calls.append(list(keys))
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.001 * (5 - len(self.calls)))
+        self.active -= 1
+        return await AsyncCache.mget(self, keys)
+
+
+@pytest.mark.asyncio
+async def test_async_chunked_cache():
+    cache = SlowCache()
+    c = chunked(cache, 2, concurrency=2)
+    assert isinstance(c, AsyncChunkedCache)
+
+    await c.mset([('k{}'.format(it), str(it).encode()) for it in range(8)], 10)
+    keys = ['k{}'.format(it) for it in [7, 6, 5, 7, 4, 3, 2, 1, 0]]
+    assert await c.mget(keys) == [it[1:].encode() for it in keys]
+    assert len(cache.calls) == 4
+    assert cache.max_active == 2
+
+    await c.mset_ttl([('k1', b'x', 20), ('k2', b'y', 20), ('k3', b'z', 20)])
+    assert cache.cache['k3'] == (b'z', 20)
+
+    await c.set('k9', b'9', 10)
+    assert await c.get('k9') == b'9'
+    await c.delete('k9')
+    await c.mdelete(['k{}'.format(it) for it in range(8)])
+    assert cache.cache == {}
+
+
+@pytest.mark.asyncio
+async def test_async_objects_chunk_size():
+    cache = make_cache(SlowCache(), fuzzy_ttl=False, fmt='unicode')
+
+    @cache.objects('user:{}', chunk_size=2)
+    async def get_users(ids):
+        return {it: u'user-{}'.format(it) for it in ids}
+
+    expected = {it: u'user-{}'.format(it) for it in range(5)}
+    assert await get_users([0, 1, 2, 3, 4, 2]) == expected
+    assert await get_users([4, 3, 2, 1, 0]) == expected
+    assert len(cache.cache.calls) == 6
+
+
+@pytest.mark.asyncio
+async def test_async_objects_chunk_concurrency():
+    cache = make_cache(SlowCache(), fuzzy_ttl=False, fmt='unicode')
+
+    @cache.objects('user:{}', chunk_size=1, concurrency=1)
+    async def get_users(ids):
+        return {it: u'user-{}'.format(it) for it in ids}
+
+    assert get_users.cache.concurrency == 1
+    assert len(await get_users([0, 1, 2])) == 3
+    assert cache.cache.max_active == 1
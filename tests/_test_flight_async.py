@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+from cachel.flight import AsyncSingleFlight
+from cachel.simple import make_cache
+from .helpers import AsyncCache
+
+
+@pytest.mark.asyncio
+async def test_async_single_flight():
+    flight = AsyncSingleFlight()
+    called = []
+
+    async def func(value):
+        called.append(value)
+        await asyncio.sleep(0.01)
+        return value
+
+    results = await asyncio.gather(*[flight('key', func, 'boo') for _ in range(5)])
+    assert called == ['boo']
+    assert results == ['boo'] * 5
+    assert not flight.calls
+
+
+@pytest.mark.asyncio
+async def test_async_single_flight_error_and_cancel():
+    flight = AsyncSingleFlight()
+
+    async def func():
+        await asyncio.sleep(0.01)
+        raise ValueError('boo')
+
+    results = await asyncio.gather(*[flight('key', func) for _ in range(3)],
+                                   return_exceptions=True)
+    assert [type(it) for it in results] == [ValueError] * 3
+
+    async def slow():
+        await asyncio.sleep(0.02)
+        return 'boo'
+
+    waiter = asyncio.ensure_future(flight('key', slow))
+    other = asyncio.ensure_future(flight('key', slow))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    assert await other == 'boo'
+    assert waiter.cancelled()
+
+    waiters = [asyncio.ensure_future(flight('key', slow)) for _ in range(2)]
+    await asyncio.sleep(0)
+    flight.calls['key'].cancel()
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+    assert [type(it) for it in results] == [asyncio.CancelledError] * 2
+    await asyncio.sleep(0)
+    assert not flight.calls
+
+
+@pytest.mark.asyncio
+async def test_async_single_flight_multi():
+    flight = AsyncSingleFlight()
+    called = []
+
+    async def func(ids):
+        called.append(sorted(ids))
+        await asyncio.sleep(0.01)
+        return {it: 'val-{}'.format(it) for it in ids if it != 3}
+
+    r1, r2 = await asyncio.gather(
+        flight.multi(['k1', 'k2'], [1, 2], func),
+        flight.multi(['k2', 'k3', 'k4'], [2, 3, 4], func))
+
+    assert called == [[1, 2], [3, 4]]
+    assert r1 == {1: 'val-1', 2: 'val-2'}
+    assert r2 == {2: 'val-2', 4: 'val-4'}
+    assert not flight.calls
+
+
+@pytest.mark.asyncio
+async def test_make_cache_async_single_flight():
+    cache = make_cache(AsyncCache(), ttl=42, fuzzy_ttl=False, fmt='unicode',
+                       single_flight=True)
+    called = []
+
+    @cache('user:{}')
+    async def get_user(user_id):
+        called.append(user_id)
+        await asyncio.sleep(0.01)
+        return u'user-{}'.format(user_id)
+
+    @cache.objects('user:{}')
+    def get_users(ids):
+        called.append(sorted(ids))
+        return {r: u'user-{}'.format(r) for r in ids}
+
+    results = await asyncio.gather(*[get_user(10) for _ in range(3)])
+    assert results == ['user-10'] * 3
+
+    results = await asyncio.gather(*[get_users([1, 2]) for _ in range(3)])
+    assert results == [{1: 'user-1', 2: 'user-2'}] * 3
+    assert called == [10, [1, 2]]
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+from cachel.simple import make_cache
+from .helpers import AsyncCache, Cache
+
+
+class CountingCache(AsyncCache):
+    def __init__(self):
+        AsyncCache.__init__(self)
+        self.mgets = []
+
+    async def mget(self, keys):
+        self.mgets.append(list(keys))
+        return await AsyncCache.mget(self, keys)
+
+
+@pytest.mark.asyncio
+async def test_auto_batch():
+    cache = make_cache(CountingCache(), fuzzy_ttl=False, fmt='unicode')
+    calls = []
+
+    @cache.objects('user:{}:{lang}', auto_batch=True)
+    async def get_users(ids, lang='en'):
+        calls.append(sorted(ids))
+        return {it: u'user-{}-{}'.format(it, lang) for it in ids if it != 0}
+
+    result = await asyncio.gather(
+        get_users.one(1), get_users.one(2), get_users.one(1), get_users.one(0),
+        get_users([2, 3]), get_users.one(1, lang='ru'))
+    assert result == ['user-1-en', 'user-2-en', 'user-1-en', None,
+                      {2: 'user-2-en', 3: 'user-3-en'}, 'user-1-ru']
+    assert calls == [[0, 1, 2, 3], [1]]
+    assert sorted(map(sorted, cache.cache.mgets)) == [
+        ['user:0:en', 'user:1:en', 'user:2:en', 'user:3:en'], ['user:1:ru']]
+
+    result = await asyncio.gather(get_users.one(1), get_users.one(3))
+    assert result == ['user-1-en', 'user-3-en']
+    assert len(calls) == 2
+    assert len(cache.cache.mgets) == 3
+
+    result = await get_users(it for it in [4, 5])
+    assert result == {4: 'user-4-en', 5: 'user-5-en'}
+    assert not get_users.loader.batches
+
+
+@pytest.mark.asyncio
+async def test_auto_batch_error():
+    cache = make_cache(AsyncCache(), fuzzy_ttl=False, fmt='unicode')
+
+    @cache.objects('user:{}:{filters}', auto_batch=True, stats=True)
+    async def get_users(ids, filters=None):
+        if 0 in ids:
+            raise Exception('boom')
+        return {it: u'user-{}'.format(it) for it in ids}
+
+    result = await asyncio.gather(get_users.one(0), get_users.one(1),
+                                  return_exceptions=True)
+    assert [str(it) for it in result] == ['boom', 'boom']
+
+    assert await get_users.one(1, filters=[]) == 'user-1'
+    assert get_users.stats.snapshot()['calls'] == 3
+
+
+def test_auto_batch_requires_async():
+    cache = make_cache(Cache())
+    with pytest.raises(Exception):
+        cache.objects('user:{}', auto_batch=True)(lambda ids: {})
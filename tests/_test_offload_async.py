@@ -0,0 +1,76 @@
+import pytest
+from cachel import offload
+from cachel.envelope import pack
+from .helpers import Cache, AsyncCache
+
+
+@pytest.mark.asyncio
+async def test_async_offload_cache(monkeypatch):
+    c1 = Cache()
+    c2 = AsyncCache()
+    cache = offload.make_offload_cache(c1, c2, fmt='unicode')
+    called = [0]
+
+    @cache('user:{}', 5, 10, fuzzy_ttl=False)
+    async def foo(user_id):
+        called[0] += 1
+        return 'user-{}'.format(user_id)
+
+    monkeypatch.setattr(offload, 'time', lambda: 20)
+    assert await foo(1) == 'user-1'
+    assert await foo(1) == 'user-1'
+    assert called == [1]
+    assert c1.cache == {'user:1': (b'user-1', 5)}
+    assert c2.cache == {'user:1': (pack(b'user-1', 25), 10)}
+
+    monkeypatch.setattr(offload, 'time', lambda: 26)
+    c1.delete('user:1')
+    assert await foo(1) == 'user-1'
+    assert await foo(1) == 'user-1'
+    await cache.async_offload.join()
+    assert called == [2]
+    assert c2.cache == {'user:1': (pack(b'user-1', 31), 10)}
+
+    await foo.set('boo', 1)
+    assert await foo.get(1) == 'boo'
+    await foo.invalidate(1)
+    assert await foo.get(1) is None
+
+
+@pytest.mark.asyncio
+async def test_async_offload_objects_cache(monkeypatch):
+    c1 = AsyncCache()
+    c2 = AsyncCache()
+    offloader = offload.AsyncOffloader(concurrency=1)
+    cache = offload.make_offload_cache(c1, c2, fmt='unicode', offload=offloader)
+    called = []
+
+    @cache.objects('user:{}', 5, 10, fuzzy_ttl=False)
+    def foo(ids, error=False):
+        called.append(sorted(ids))
+        if error:
+            raise Exception('boo')
+        return {r: 'user-{}'.format(r) for r in ids if r != 3}
+
+    monkeypatch.setattr(offload, 'time', lambda: 20)
+    assert await foo([1, 2]) == {1: 'user-1', 2: 'user-2'}
+    assert c2.cache['user:1'] == (pack(b'user-1', 25), 10)
+
+    monkeypatch.setattr(offload, 'time', lambda: 26)
+    await c1.delete('user:1')
+    await c1.delete('user:2')
+    assert await foo([1, 2]) == {1: 'user-1', 2: 'user-2'}
+    await c1.mdelete(['user:1', 'user:2'])
+    assert await foo([2, 1]) == {1: 'user-1', 2: 'user-2'}
+    await offloader.join()
+    assert called == [[1, 2], [1, 2]]
+    assert c2.cache['user:1'] == (pack(b'user-1', 31), 10)
+
+    monkeypatch.setattr(offload, 'time', lambda: 40)
+    await c1.delete('user:1')
+    assert await foo([1], error=True) == {1: 'user-1'}
+    await offloader.join()
+    assert not offloader.pending
+
+    assert await foo.one(3) is None
+    assert 'user:3' not in c2.cache
@@ -0,0 +1,24 @@
+import pytest
+from cachel.sharded import AsyncShardedCache
+from .helpers import AsyncCache
+
+
+@pytest.mark.asyncio
+async def test_async_sharded_cache():
+    caches = [AsyncCache() for _ in range(3)]
+    c = AsyncShardedCache(caches)
+    keys = ['key:{}'.format(it) for it in range(30)]
+
+    await c.mset([(k, k.encode()) for k in keys], 10)
+    assert all(cache.cache for cache in caches)
+    assert await c.mget(keys[::-1]) == [k.encode() for k in keys[::-1]]
+
+    await c.mset_ttl([('key:1', b'foo', 20)])
+    assert await c.get('key:1') == b'foo'
+
+    await c.set('key:2', b'bar', 10)
+    await c.delete('key:2')
+    assert await c.get('key:2') is None
+
+    await c.mdelete(keys)
+    assert not any(cache.cache for cache in caches)
@@ -1,5 +1,9 @@
+import time
+
 import pytest
 from cachel import expire
+from cachel.envelope import pack
+from cachel.base import TOMBSTONE
 from cachel.simple import make_cache
 from .helpers import Cache, AsyncCache
 
@@ -116,3 +120,57 @@ async def test_objects_async_full():
     await get_val({1: None})
     await get_val.invalidate([1])
     assert await get_val.one(3) == None
+
+
+@pytest.mark.asyncio
+async def test_objects_async_negative_ttl():
+    cache = make_cache(AsyncCache(), ttl=42, fuzzy_ttl=False, fmt='unicode',
+                       negative_ttl=5)
+    called = []
+
+    @cache.objects('val:{}')
+    async def get_val(ids):
+        called.append(sorted(ids))
+        return {}
+
+    assert await get_val([1]) == {}
+    assert await get_val.one(1) is None
+    assert called == [[1]]
+    assert get_val.cache.cache == {'val:1': (TOMBSTONE, 5)}
+
+
+@pytest.mark.asyncio
+async def test_objects_async_stats():
+    cache = make_cache(AsyncCache(), ttl=42, fuzzy_ttl=False, fmt='unicode', stats=True)
+
+    @cache.objects('val:{}')
+    async def get_val(ids):
+        return {it: 'val' for it in ids}
+
+    await get_val([1, 2])
+    assert await get_val.one(1) == 'val'
+
+    data = get_val.stats.snapshot()
+    assert (data['calls'], data['requests'], data['hits'], data['misses']) == (2, 3, 1, 2)
+    assert data['timers']['backend']['count'] == 3
+    assert data['timers']['func']['count'] == 1
+
+
+@pytest.mark.asyncio
+async def test_simple_async_stale_ttl():
+    cache = make_cache(AsyncCache(), ttl=10, fuzzy_ttl=False, fmt='unicode',
+                       stale_ttl=50)
+    calls = []
+
+    @cache('user:{}')
+    async def get_user(user_id):
+        calls.append(user_id)
+        return u'user-{}'.format(user_id)
+
+    await cache.cache.set('user:1', pack(b'old', time.time() - 1), 60)
+    assert await get_user(1) == 'old'
+    assert await get_user(1) == 'old'
+    await cache.async_offload.join()
+    assert calls == [1]
+    assert await get_user(1) == 'user-1'
+    assert (await get_user.get(1)) == 'user-1'
@@ -0,0 +1,45 @@
+import pytest
+from cachel.simple import make_cache
+from cachel.tiered import AsyncTieredCache
+from .helpers import Cache, AsyncCache
+
+
+@pytest.mark.asyncio
+async def test_async_tiered_cache():
+    l1 = Cache()
+    l2 = AsyncCache()
+    c = AsyncTieredCache(l1, l2, l1_ttl=5)
+
+    await c.set('key1', b'value1', 10)
+    assert l1.cache == {'key1': (b'value1', 5)}
+    assert l2.cache == {'key1': (b'value1', 10)}
+
+    l1.cache.clear()
+    assert await c.get('key1') == b'value1'
+    assert l1.cache == {'key1': (b'value1', 5)}
+    assert await c.get('key2') is None
+
+    await c.mset([('key2', b'value2')], 3)
+    await c.mset_ttl([('key3', b'value3', 20)])
+    l1.cache.clear()
+    assert await c.mget(['key2', 'key3', 'key4']) == [b'value2', b'value3', None]
+    assert l1.cache == {'key2': (b'value2', 5), 'key3': (b'value3', 5)}
+
+    await c.delete('key1')
+    await c.mdelete(['key2', 'key3'])
+    assert not l1.cache
+    assert not l2.cache
+
+
+@pytest.mark.asyncio
+async def test_async_tiered_cache_with_make_cache():
+    l2 = AsyncCache()
+    cache = make_cache(AsyncTieredCache(None, l2), ttl=42, fuzzy_ttl=False, fmt='unicode')
+
+    @cache('user:{}')
+    def get_user(user_id):
+        return u'user-{}'.format(user_id)
+
+    assert await get_user(1) == 'user-1'
+    l2.cache.clear()
+    assert await get_user(1) == 'user-1'
@@ -0,0 +1,51 @@
+import pytest
+from cachel import offload
+from cachel.simple import make_cache
+from .helpers import Cache, AsyncCache
+
+
+@pytest.mark.asyncio
+async def test_async_objects_warm():
+    c = AsyncCache()
+    cache = make_cache(c, fmt='unicode', fuzzy_ttl=False, stats=True)
+    called = []
+
+    @cache.objects('user:{}', ttl=10)
+    async def users(ids):
+        called.append(sorted(ids))
+        return {it: 'user-{}'.format(it) for it in ids}
+
+    await users.one(2)
+    called[:] = []
+
+    async def gen():
+        for it in range(1, 6):
+            yield it
+
+    progress = []
+    result = await users.warm(gen(), chunk_size=2, concurrency=2,
+                              progress=lambda *args: progress.append(args))
+    assert result == (5, 4)
+    assert sorted(called) == [[1], [3, 4], [5]]
+    assert progress == [(2, 1), (4, 3), (5, 4)]
+    assert len(c.cache) == 5
+
+    assert await users.warm(range(1, 6)) == (5, 0)
+    data = users.stats.snapshot()
+    assert (data['requests'], data['misses']) == (11, 5)
+
+
+@pytest.mark.asyncio
+async def test_async_offload_objects_warm(monkeypatch):
+    c1 = Cache()
+    c2 = AsyncCache()
+    cache = offload.make_offload_cache(c1, c2, fmt='unicode')
+
+    @cache.objects('user:{}', 5, 10, fuzzy_ttl=False)
+    async def users(ids):
+        return {it: 'user-{}'.format(it) for it in ids}
+
+    monkeypatch.setattr(offload, 'time', lambda: 20)
+    assert await users.warm([1, 2, 3], chunk_size=2) == (3, 3)
+    assert sorted(c2.cache) == ['user:1', 'user:2', 'user:3']
+    assert await users.warm([1, 2, 3]) == (3, 0)
@@ -1,5 +1,8 @@
+import os
+
 import cachel.wrappers
-from cachel.ast_transformer import import_module
+from cachel import ast_transformer
+from cachel.ast_transformer import import_module, execute, cache_fname
 
 
 def test_simple():
@@ -9,3 +12,31 @@ def test_simple():
     assert wrappers_t.params == params
     assert wrappers_t.CacheWrapper
     assert wrappers_t.ObjectsCacheWrapper
+
+
+def test_disk_cache(monkeypatch, tmpdir):
+    params = (('fn', False), ('cache', False), ('call', False))
+    monkeypatch.setattr(ast_transformer, 'GEN_CACHE', {})
+    monkeypatch.setattr(ast_transformer, 'cache_fname',
+                        lambda fname, params: str(tmpdir.join('wrappers.pyc')))
+    monkeypatch.setattr(ast_transformer.sys, 'dont_write_bytecode', False)
+    assert execute('cachel.wrappers.wrappers_t', params)['CacheWrapper']
+    assert os.path.exists(str(tmpdir.join('wrappers.pyc')))
+
+    def transform(fname, params):  # pragma: no cover
+        raise Exception('must not be called')
+
+    monkeypatch.setattr(ast_transformer, 'GEN_CACHE', {})
+    monkeypatch.setattr(ast_transformer, 'transform', transform)
+    assert execute('cachel.wrappers.wrappers_t', params)['CacheWrapper']
+
+
+def test_cache_fname():
+    params = (('fn', True), ('cache', False))
+    fname = cache_fname('/tmp/wrappers_t.py', params)
+    assert fname.startswith('/tmp/__pycache__/wrappers_t.fn1-cache0.')
+    assert fname.endswith('.pyc')
+
+
+def test_precompile():
+    cachel.wrappers.precompile()
@@ -1,5 +1,7 @@
+import pytest
+from cachel import compat
 from cachel.base import make_key_func, wrap_in, wrap_dict_value_in
-from cachel.base import gen_expire
+from cachel.base import gen_expire, digest_key, get_serializer, get_loads_many
 
 
 def test_make_key_func():
@@ -36,6 +38,84 @@ def test_make_key_func():
     assert f([20, 30], 'boo') == ['boo-20', 'boo-30']
 
 
+def test_make_key_func_field_paths():
+    class User(object):
+        id = 10
+
+    f = make_key_func('{user.id}:{filters[lang]}', lambda user, filters: None)
+    assert f(User(), {'lang': 'en'}) == '10:en'
+
+    f = make_key_func('{.id}:{}', lambda user, lang: None)
+    assert f(User(), 'en') == '10:en'
+
+    f = make_key_func('{id.id}-{lang}', lambda ids, lang='en': None, True)
+    assert f([User()]) == ['10-en']
+
+    f = make_key_func('{items[0]}:{items[1][a b]}', lambda items: None)
+    assert f(['boo', {'a b': 1}]) == 'boo:1'
+
+    with pytest.raises(AssertionError):
+        make_key_func('{user.id()}', lambda user: None)
+
+
+def test_make_key_func_varargs():
+    f = make_key_func('{user_id}:{kwargs[lang]}:{args[0]}',
+                      lambda user_id, *args, **kwargs: None)
+    assert f(10, 'boo', lang='en') == '10:en:boo'
+
+    f = make_key_func('{user_id}:{lang}', lambda *args, **kwargs: None,
+                      spec='user_id, lang="en", **kwargs')
+    assert f(10) == '10:en'
+    assert f(10, lang='ru', boo=1) == '10:ru'
+
+    f = make_key_func('{id}:{lang}', lambda *args, **kwargs: None, True,
+                      spec=lambda ids, lang='en', **kwargs: None)
+    assert f([1, 2], boo=1) == ['1:en', '2:en']
+
+    if compat.PY2:
+        return
+
+    f = make_key_func('{user_id}:{lang}', eval("lambda user_id, *, lang='en': None"))
+    assert f(10) == '10:en'
+    assert f(10, lang='ru') == '10:ru'
+
+
+def test_make_key_func_max_size():
+    f = make_key_func('key:{}', lambda foo: None, max_size=40)
+    assert f('short') == 'key:short'
+    key = f('x' * 100)
+    assert len(key) == 40
+    assert key.startswith('key:xxx')
+    assert key == digest_key('key:' + 'x' * 100, 40)
+    assert f('y' * 100) != key
+    assert len(digest_key('key:' + 'x' * 100, 10)) == 10
+    assert len(digest_key('key:' + 'x' * 100, 33)) == 32
+    with pytest.raises(Exception) as ei:
+        make_key_func('key:{}', lambda foo: None, max_size=32)
+    assert 'max_key_size' in str(ei.value)
+
+    f = make_key_func('{foo}-{id}', lambda ids, foo=None: None, True, max_size=40)
+    assert f([20, 'x' * 100], 'boo') == ['boo-20', digest_key('boo-' + 'x' * 100, 40)]
+
+    f = make_key_func(lambda foo: foo, lambda foo: None, max_size=40)
+    assert f('key:' + 'x' * 100) == key
+
+    f = make_key_func(lambda ids: ids, lambda ids: None, True, max_size=40)
+    assert f(['key', 'key:' + 'x' * 100]) == ['key', key]
+
+    f = make_key_func('x' * 100, lambda foo: None, max_size=40)
+    assert len(f(1)) == 40
+
+    assert len(digest_key(u'\u0444' * 100, 40).encode('utf-8')) <= 40
+    assert len(digest_key(u'\u0444' * 30, 40).encode('utf-8')) <= 40
+    assert digest_key(u'\u0444' * 20, 40) == u'\u0444' * 20
+
+    f = make_key_func('{}', lambda ids: None, True, max_size=40)
+    keys = f([u'\u0444' * 30, u'\u0444' * 20])
+    assert keys == [digest_key(u'\u0444' * 30, 40), u'\u0444' * 20]
+    assert len(keys[0].encode('utf-8')) <= 40
+
+
 def test_gen_expire():
     assert 9 <= gen_expire(10) <= 11
 
@@ -96,3 +176,28 @@ def test_wrap_dict_value_in():
 #     assert result == 'boo'
 #     assert not l1.cache.cache
 #     assert not l2.cache.cache
+
+
+def test_loads_many():
+    dumps, loads = serializer = get_serializer('msgpack')
+    loads_many = get_loads_many(serializer)
+    values = [dumps({'id': it}) for it in range(3)]
+    assert loads_many(values) == [{'id': 0}, {'id': 1}, {'id': 2}]
+    assert loads_many(values[:1]) == [{'id': 0}]
+    assert loads_many([]) == []
+    assert loads_many([memoryview(it) for it in values]) == loads_many(values)
+
+    with pytest.raises(Exception):
+        loads_many([values[0], values[1][:-1]])
+
+    # values crossing their boundaries must not be glued together
+    with pytest.raises(Exception):
+        loads_many([b'\x91', b'\x01', b'\x02\x03'])
+    with pytest.raises(Exception):
+        loads_many([b'\x01\x02', b'\x03'])
+
+    loads_many = get_loads_many(get_serializer('unicode'))
+    assert loads_many([b'boo', b'foo']) == [u'boo', u'foo']
+
+    loads_many = get_loads_many(get_serializer((str, int)))
+    assert loads_many(['1', '2']) == [1, 2]
@@ -0,0 +1,77 @@
+import time
+from threading import Thread
+
+import pytest
+from cachel.batching import BatchingCache
+from .helpers import Cache
+
+
+class CountingCache(Cache):
+    def __init__(self):
+        Cache.__init__(self)
+        self.mgets = []
+
+    def mget(self, keys):
+        self.mgets.append(sorted(keys))
+        if 'error' in keys:
+            raise Exception('boom')
+        return Cache.mget(self, keys)
+
+
+def run_threads(func, args):
+    results = [None] * len(args)
+
+    def worker(idx, arg):
+        try:
+            results[idx] = func(arg)
+        except Exception as e:
+            results[idx] = e
+
+    threads = [Thread(target=worker, args=it) for it in enumerate(args)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_batching_cache():
+    cache = CountingCache()
+    c = BatchingCache(cache, window=5, max_keys=3)
+    c.mset([('key1', b'1'), ('key2', b'2')], 10)
+
+    start = time.time()
+    result = run_threads(c.get, ['key1', 'key2', 'key3'])
+    assert time.time() - start < 2
+    assert result == [b'1', b'2', None]
+    assert cache.mgets == [['key1', 'key2', 'key3']]
+
+    cache.mgets[:] = []
+    assert c.mget(['key1', 'key2', 'key3']) == [b'1', b'2', None]
+    assert cache.mgets == [['key1', 'key2', 'key3']]
+
+
+def test_batching_cache_window():
+    cache = CountingCache()
+    c = BatchingCache(cache, window=0.001)
+    c.set('key1', b'1', 10)
+    assert c.get('key1') == b'1'
+    assert c.mget(['key1', 'key1', 'key2']) == [b'1', b'1', None]
+    assert cache.mgets == [['key1'], ['key1', 'key2']]
+
+    c.mset_ttl([('key2', b'2', 10)])
+    c.delete('key1')
+    assert c.mget(['key1', 'key2']) == [None, b'2']
+    c.mdelete(['key2'])
+    assert cache.cache == {}
+
+
+def test_batching_cache_error():
+    cache = CountingCache()
+    c = BatchingCache(cache, window=5, max_keys=2)
+    result = run_threads(c.get, ['key1', 'error'])
+    assert [str(it) for it in result] == ['boom', 'boom']
+    assert cache.mgets == [['error', 'key1']]
+
+    with pytest.raises(Exception):
+        BatchingCache(cache, window=0.001).get('error')
@@ -0,0 +1,95 @@
+from cachel.chunked import ChunkedCache, chunked, unique_keys
+from cachel.simple import make_cache
+from cachel.offload import make_offload_cache
+from .helpers import Cache
+
+
+class CountingCache(Cache):
+    def __init__(self):
+        Cache.__init__(self)
+        self.calls = []
+
+    def mget(self, keys):
+        self.calls.append(('mget', list(keys)))
+        return Cache.mget(self, keys)
+
+    def mset(self, items, ttl):
+        items = list(items)
+        self.calls.append(('mset', [it[0] for it in items]))
+        Cache.mset(self, items, ttl)
+
+    def mset_ttl(self, items):
+        items = list(items)
+        self.calls.append(('mset_ttl', [it[0] for it in items]))
+        for k, v, ttl in items:
+            self.set(k, v, ttl)
+
+
+def test_unique_keys():
+    assert unique_keys(['a', 'b']) == (['a', 'b'], None)
+    assert unique_keys(['a', 'b', 'a']) == (['a', 'b'], [0, 1, 0])
+
+
+def test_chunked_cache():
+    cache = CountingCache()
+    c = chunked(cache, 2)
+    assert isinstance(c, ChunkedCache)
+
+    c.mset([('k1', b'1'), ('k2', b'2'), ('k3', b'3'), ('k1', b'4')], 10)
+    assert cache.calls == [('mset', ['k1', 'k2']), ('mset', ['k3'])]
+    assert cache.cache['k1'] == (b'4', 10)
+
+    cache.calls[:] = []
+    assert c.mget(['k3', 'k1', 'k3', 'k4', 'k2']) == [b'3', b'4', b'3', None, b'2']
+    assert cache.calls == [('mget', ['k3', 'k1']), ('mget', ['k4', 'k2'])]
+
+    cache.calls[:] = []
+    assert c.mget(['k1', 'k1']) == [b'4', b'4']
+    assert cache.calls == [('mget', ['k1', 'k1'])]
+
+    cache.calls[:] = []
+    c.mset_ttl([('k1', b'5', 20), ('k2', b'6', 20), ('k3', b'7', 20)])
+    assert cache.calls == [('mset_ttl', ['k1', 'k2']), ('mset_ttl', ['k3'])]
+
+    c.set('k4', b'8', 10)
+    assert c.get('k4') == b'8'
+    c.delete('k4')
+    c.mdelete(['k1', 'k2', 'k1', 'k3'])
+    assert cache.cache == {}
+
+
+def test_objects_chunk_size():
+    cache = make_cache(CountingCache(), fuzzy_ttl=False, fmt='unicode')
+
+    @cache.objects('user:{}', chunk_size=2)
+    def get_users(ids):
+        return {it: u'user-{}'.format(it) for it in ids}
+
+    expected = {it: u'user-{}'.format(it) for it in range(5)}
+    assert get_users([0, 1, 2, 3, 4, 2]) == expected
+    assert [len(it[1]) for it in cache.cache.calls if it[0] != 'mget'] == [2, 2, 1]
+
+    cache.cache.calls[:] = []
+    assert get_users([4, 3, 2, 1, 0, 2]) == expected
+    assert cache.cache.calls == [('mget', ['user:4', 'user:3']),
+                                 ('mget', ['user:2', 'user:1']),
+                                 ('mget', ['user:0'])]
+
+
+def test_offload_objects_chunk_size():
+    c1, c2 = CountingCache(), CountingCache()
+    cache = make_offload_cache(c1, c2, fuzzy_ttl=False, fmt='unicode')
+
+    @cache.objects('user:{}', chunk_size=2)
+    def get_users(ids):
+        return {it: u'user-{}'.format(it) for it in ids}
+
+    expected = {it: u'user-{}'.format(it) for it in range(3)}
+    assert get_users([0, 1, 2]) == expected
+    assert [len(it[1]) for it in c1.calls if it[0] == 'mset'] == [2, 1]
+    assert [len(it[1]) for it in c2.calls if it[0] == 'mset'] == [2, 1]
+
+    c1.cache.clear()
+    c1.calls[:] = []
+    assert get_users([2, 1, 0]) == expected
+    assert [it[0] for it in c1.calls] == ['mget', 'mget', 'mset', 'mset']
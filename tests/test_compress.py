@@ -0,0 +1,60 @@
+import pytest
+from cachel.base import get_serializer, SERIALIZERS
+from cachel.compress import zlib_serializer
+
+
+def test_zlib_format():
+    dumps, loads = get_serializer('json+zlib')
+
+    data = dumps({'key': 'value'})
+    assert data == b'\xc1z\x00{"key": "value"}'
+    assert loads(data) == {'key': 'value'}
+
+    value = {'key': 'value' * 1000}
+    data = dumps(value)
+    assert data[:3] == b'\xc1z\x01'
+    assert len(data) < 100
+    assert loads(data) == value
+
+    dumps, loads = get_serializer('msgpack+zlib')
+    assert loads(dumps(value)) == value
+
+    # values without a codec header are loaded as is
+    assert loads(get_serializer('msgpack')[0](value)) == value
+    for it in (0, 1, 2, -1, u'boo', None):
+        assert loads(get_serializer('msgpack')[0](it)) == it
+
+    with pytest.raises(Exception) as ei:
+        get_serializer('json+boo')
+    assert 'Unknown serializer' in str(ei.value)
+
+
+def test_missing_serializer_module(monkeypatch):
+    def loader():
+        import cachel_missing_module  # noqa
+
+    monkeypatch.setitem(SERIALIZERS.loaders, 'missing', loader)
+    with pytest.raises(Exception) as ei:
+        get_serializer('missing')
+    assert 'Unknown serializer: missing' in str(ei.value)
+    assert not isinstance(ei.value, ImportError)
+
+
+def test_zlib_serializer_with_zdict():
+    zdict = b'{"name": "user-", "email": "@example.com"}'
+    dumps, loads = zlib_serializer(SERIALIZERS['unicode'], threshold=10, zdict=zdict)
+    plain_dumps, plain_loads = zlib_serializer(SERIALIZERS['unicode'], threshold=10)
+
+    value = u'{"name": "user-1", "email": "user-1@example.com"}'
+    data = dumps(value)
+    assert data[:3] == b'\xc1z\x02'
+    assert len(data) < len(plain_dumps(value))
+    assert loads(data) == value
+    assert loads(plain_dumps(value)) == value
+    assert loads(dumps(u'boo')) == u'boo'
+
+    with pytest.raises(Exception) as ei:
+        plain_loads(data)
+    assert 'zdict' in str(ei.value)
+
+    assert get_serializer((dumps, loads)) == (dumps, loads)
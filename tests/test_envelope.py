@@ -0,0 +1,17 @@
+from cachel.envelope import pack, unpack, unpack_expire, HEADER_SIZE, PREFIX
+
+
+def test_envelope():
+    data = pack(b'value', 1000.5, 0.25)
+    assert len(data) == HEADER_SIZE + 5
+    assert data[:3] == PREFIX
+    assert unpack(data) == (1000.5, 0.25, b'value')
+    assert unpack(pack(u'value', 10)) == (10, 0, b'value')
+    assert unpack_expire(data) == (1000.5, b'value')
+
+    assert unpack(b'value') is None
+    assert unpack(b'\x02' + b'x' * 20) is None
+    assert unpack(data[:HEADER_SIZE - 1]) is None
+    # codec headers and old single byte envelopes are foreign
+    assert unpack(b'\x01' + data[3:]) is None
+    assert unpack(b'\xc1z\x01' + data[3:]) is None
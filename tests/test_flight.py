@@ -0,0 +1,85 @@
+import time
+from threading import Thread
+
+import pytest
+from cachel.flight import SingleFlight
+
+
+def run_threads(count, target):
+    threads = [Thread(target=target) for _ in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def test_single_flight():
+    flight = SingleFlight()
+    called = []
+    results = []
+
+    def func(value):
+        called.append(value)
+        time.sleep(0.05)
+        return value
+
+    run_threads(5, lambda: results.append(flight('key', func, 'boo')))
+    assert called == ['boo']
+    assert results == ['boo'] * 5
+    assert not flight.calls
+
+    assert flight('key', func, 'foo') == 'foo'
+    assert called == ['boo', 'foo']
+
+
+def test_single_flight_error():
+    flight = SingleFlight()
+    errors = []
+
+    def func():
+        time.sleep(0.05)
+        raise ValueError('boo')
+
+    def target():
+        try:
+            flight('key', func)
+        except ValueError as e:
+            errors.append(e)
+
+    run_threads(3, target)
+    assert len(errors) == 3
+    assert not flight.calls
+
+
+def test_single_flight_multi():
+    flight = SingleFlight()
+    called = []
+    results = []
+
+    def func(ids):
+        called.append(sorted(ids))
+        time.sleep(0.05)
+        return {it: 'val-{}'.format(it) for it in ids if it != 3}
+
+    t = Thread(target=lambda: results.append(
+        flight.multi(['k1', 'k2'], [1, 2], func)))
+    t.start()
+    time.sleep(0.01)
+    result = flight.multi(['k2', 'k3', 'k4'], [2, 3, 4], func)
+    t.join()
+
+    assert called == [[1, 2], [3, 4]]
+    assert result == {2: 'val-2', 4: 'val-4'}
+    assert results == [{1: 'val-1', 2: 'val-2'}]
+    assert not flight.calls
+
+
+def test_single_flight_multi_error():
+    flight = SingleFlight()
+
+    def func(ids):
+        raise ValueError('boo')
+
+    with pytest.raises(ValueError):
+        flight.multi(['k1'], [1], func)
+    assert not flight.calls
@@ -0,0 +1,4 @@
+from cachel import compat
+
+if compat.ASYNC_AWAIT:
+    from ._test_loader_async import *
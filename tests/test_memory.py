@@ -0,0 +1,78 @@
+from cachel import memory
+from cachel.memory import MemoryCache
+
+
+def test_memory_cache(monkeypatch):
+    monkeypatch.setattr(memory, 'time', lambda: 20)
+    c = MemoryCache()
+    assert c.get('key1') is None
+
+    c.set('key1', b'value', 10)
+    assert c.get('key1') == b'value'
+
+    c.mset([('key1', b'value1'), ('key2', b'value2')], 20)
+    assert c.mget(['key2', 'key1', 'key3']) == [b'value2', b'value1', None]
+
+    c.mset_ttl([('key1', b'value3', 30), ('key2', b'value4', 5)])
+    assert c.mget(['key1', 'key2']) == [b'value3', b'value4']
+    assert c.data['key2'][1] == 25
+
+    c.delete('key1')
+    assert c.get('key1') is None
+
+    c.mdelete(['key2', 'key3'])
+    assert c.get('key2') is None
+
+    c.set('key1', b'value', 0)
+    monkeypatch.setattr(memory, 'time', lambda: 1000)
+    assert c.get('key1') == b'value'
+
+    c.clear()
+    assert c.get('key1') is None
+
+
+def test_memory_cache_ttl(monkeypatch):
+    monkeypatch.setattr(memory, 'time', lambda: 20)
+    c = MemoryCache(cleanup_interval=100)
+    c.mset([('key1', b'value1'), ('key2', b'value2')], 10)
+    c.set('key3', b'value3', 100)
+
+    monkeypatch.setattr(memory, 'time', lambda: 31)
+    assert c.get('key1') is None
+    assert len(c.data) == 2
+
+    monkeypatch.setattr(memory, 'time', lambda: 120)
+    c.set('key4', b'value4', 10)
+    assert list(c.data) == ['key3', 'key4']
+    assert c.size == 0
+
+
+def test_memory_cache_lru():
+    c = MemoryCache(max_items=2)
+    c.set('key1', b'value1', 10)
+    c.set('key2', b'value2', 10)
+    assert c.get('key1') == b'value1'
+
+    c.set('key3', b'value3', 10)
+    assert c.mget(['key1', 'key2', 'key3']) == [b'value1', None, b'value3']
+
+
+def test_memory_cache_max_size():
+    c = MemoryCache(max_size=10)
+    c.set('key1', b'12345', 10)
+    c.set('key2', b'12345', 10)
+    assert c.size == 10
+
+    c.set('key1', b'123', 10)
+    assert c.size == 8
+
+    c.set('key3', b'1234', 10)
+    assert c.mget(['key1', 'key2', 'key3']) == [b'123', None, b'1234']
+    assert c.size == 7
+
+    c.set('key3', b'12345678901', 10)
+    assert c.get('key3') is None
+    assert c.size == 3
+
+    c.mdelete(['key1'])
+    assert c.size == 0
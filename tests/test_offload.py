@@ -1,5 +1,7 @@
 import time
 from cachel import offload
+from cachel.base import TOMBSTONE
+from cachel.envelope import pack
 from .helpers import Cache
 
 
@@ -20,14 +22,14 @@ def test_offload_cache(monkeypatch):
     assert result == 'user-1'
     assert called == [1]
     assert c1.cache == {'user:1': (b'user-1', 5)}
-    assert c2.cache == {'user:1': (b'25:user-1', 10)}
+    assert c2.cache == {'user:1': (pack(b'user-1', 25), 10)}
 
     # get with unexpired caches
     result = foo(1)
     assert result == 'user-1'
     assert called == [1]
     assert c1.cache == {'user:1': (b'user-1', 5)}
-    assert c2.cache == {'user:1': (b'25:user-1', 10)}
+    assert c2.cache == {'user:1': (pack(b'user-1', 25), 10)}
 
     # get with expired c1 and unexpired value from c2
     c1.delete('user:1')
@@ -35,7 +37,7 @@ def test_offload_cache(monkeypatch):
     assert result == 'user-1'
     assert called == [1]
     assert c1.cache == {'user:1': (b'user-1', 5)}
-    assert c2.cache == {'user:1': (b'25:user-1', 10)}
+    assert c2.cache == {'user:1': (pack(b'user-1', 25), 10)}
 
     # get with expired c1 and expired value from c2
     monkeypatch.setattr(offload, 'time', lambda: 26)
@@ -44,7 +46,7 @@ def test_offload_cache(monkeypatch):
     assert result == 'user-1'
     assert called == [2]
     assert c1.cache == {'user:1': (b'user-1', 5)}
-    assert c2.cache == {'user:1': (b'31:user-1', 10)}
+    assert c2.cache == {'user:1': (pack(b'user-1', 31), 10)}
 
 
 def test_default_offload_with_exc(monkeypatch):
@@ -133,14 +135,14 @@ def test_offload_objects_cache(monkeypatch):
     assert result == {1: 'user-1'}
     assert called == [1]
     assert c1.cache == {'user:1': (b'user-1', 5)}
-    assert c2.cache == {'user:1': (b'26:user-1', 10)}
+    assert c2.cache == {'user:1': (pack(b'user-1', 26), 10)}
 
     # get with unexpired caches
     result = foo([1])
     assert result == {1: 'user-1'}
     assert called == [1]
     assert c1.cache == {'user:1': (b'user-1', 5)}
-    assert c2.cache == {'user:1': (b'26:user-1', 10)}
+    assert c2.cache == {'user:1': (pack(b'user-1', 26), 10)}
 
     # get with expired c1 and unexpired value from c2
     c1.delete('user:1')
@@ -148,7 +150,7 @@ def test_offload_objects_cache(monkeypatch):
     assert result == {1: 'user-1'}
     assert called == [1]
     assert c1.cache == {'user:1': (b'user-1', 5)}
-    assert c2.cache == {'user:1': (b'26:user-1', 10)}
+    assert c2.cache == {'user:1': (pack(b'user-1', 26), 10)}
 
     # get with expired c1 and expired value from c2
     monkeypatch.setattr(offload, 'time', lambda: 27)
@@ -157,7 +159,7 @@ def test_offload_objects_cache(monkeypatch):
     assert result == {1: 'user-1'}
     assert called == [2]
     assert c1.cache == {'user:1': (b'user-1', 5)}
-    assert c2.cache == {'user:1': (b'33:user-1', 10)}
+    assert c2.cache == {'user:1': (pack(b'user-1', 33), 10)}
 
     assert foo.one(1) == 'user-1'
     assert foo.one(3, miss=3) is None
@@ -205,4 +207,174 @@ def test_thread_offloader(monkeypatch):
     offloader.run()
     time.sleep(0.1)
     assert c1.cache == {'user:1': (b'user-1', 5)}
-    assert c2.cache == {'user:1': (b'25:user-1', 10)}
+    assert c2.cache == {'user:1': (pack(b'user-1', 25), 10)}
+
+
+def test_offload_objects_cache_negative_ttl(monkeypatch):
+    c1 = Cache()
+    c2 = Cache()
+    cache = offload.make_offload_cache(c1, c2, fmt='unicode', negative_ttl=3)
+    called = []
+
+    @cache.objects('user:{}', 5, 10, fuzzy_ttl=False)
+    def foo(ids):
+        called.append(sorted(ids))
+        return {r: 'user-{}'.format(r) for r in ids if r != 2}
+
+    monkeypatch.setattr(offload, 'time', lambda: 20)
+    assert foo([1, 2]) == {1: 'user-1'}
+    assert c1.cache == {'user:1': (b'user-1', 5), 'user:2': (TOMBSTONE, 3)}
+    assert c2.cache == {'user:1': (pack(b'user-1', 25), 10), 'user:2': (pack(TOMBSTONE, 25), 3)}
+
+    assert foo([1, 2]) == {1: 'user-1'}
+    c1.delete('user:2')
+    assert foo.one(2) is None
+    assert c1.cache['user:2'] == (TOMBSTONE, 3)
+    assert called == [[1, 2]]
+
+
+def test_thread_offloader_dedup_and_stats(monkeypatch):
+    c1 = Cache()
+    c2 = Cache()
+    offloader = offload.ThreadOffloader(size=2, workers=2)
+    cache = offload.make_offload_cache(c1, c2, fmt='unicode', offload=offloader)
+    called = []
+
+    @cache.objects('user:{}', 5, 10, fuzzy_ttl=False)
+    def foo(ids, miss=None):
+        called.append(sorted(ids))
+        return {r: 'user-{}'.format(r) for r in ids if r != miss}
+
+    @cache('user:{}', 5, 10, fuzzy_ttl=False)
+    def boo(user_id):
+        called.append(user_id)
+        return 'user-{}'.format(user_id)
+
+    monkeypatch.setattr(offload, 'time', lambda: 20)
+    offloader(foo, [1, 2], (), {}, True)
+    offloader(foo, [2, 1], (), {}, True)
+    offloader(boo, 'user:3', (3,), {})
+    offloader(boo, 'user:3', (3,), {})
+    offloader(boo, 'user:4', (4,), {})
+    offloader(foo, [1], ([],), {}, True)
+    assert offloader.stats()['queue_depth'] == 2
+
+    threads = offloader.run_workers()
+    assert len(threads) == 2
+    time.sleep(0.1)
+
+    assert sorted(called, key=str) == [3, [1, 2]]
+    assert c2.cache['user:3'] == (pack(b'user-3', 25), 10)
+
+    stats = offloader.stats()
+    assert stats['queue_depth'] == 0
+    assert stats['queued'] == 2
+    assert stats['processed'] == 2
+    assert stats['deduplicated'] == 1
+    assert stats['merged'] == 1
+    assert stats['dropped'] == 2
+    assert stats['avg_latency'] == 0
+    assert not offloader.pending
+
+
+def test_thread_offloader_batches(monkeypatch):
+    c1 = Cache()
+    c2 = Cache()
+    offloader = offload.ThreadOffloader(batch_size=3, window=0.05)
+    cache = offload.make_offload_cache(c1, c2, fmt='unicode', offload=offloader)
+    called = []
+
+    @cache.objects('user:{}', 5, 10, fuzzy_ttl=False)
+    def foo(ids, prefix='user'):
+        called.append((prefix, sorted(ids)))
+        return {r: '{}-{}'.format(prefix, r) for r in ids}
+
+    offloader(foo, [1], (), {}, True)
+    offloader(foo, [2, 1], (), {}, True)
+    offloader(foo, [3], (), {}, True)
+    offloader(foo, [4], (), {}, True)
+    offloader(foo, [1], ('admin',), {}, True)
+    assert offloader.run().is_alive()
+    time.sleep(0.01)
+    assert sorted(called) == [('user', [1, 2, 3])]
+
+    offloader(foo, [5], (), {}, True)
+    time.sleep(0.1)
+    assert sorted(called) == [('admin', [1]), ('user', [1, 2, 3]), ('user', [4, 5])]
+    assert offloader.stats()['merged'] == 3
+    assert not offloader.batches
+
+
+def test_thread_offloader_batch_cap_and_window():
+    offloader = offload.ThreadOffloader(batch_size=3, window=1)
+    cache = offload.make_offload_cache(Cache(), Cache(), fmt='unicode', offload=offloader)
+    called = []
+
+    @cache.objects('user:{}', 5, 10, fuzzy_ttl=False)
+    def foo(ids):
+        called.append(sorted(ids))
+        return {r: 'user-{}'.format(r) for r in ids}
+
+    @cache('user:{}', 5, 10, fuzzy_ttl=False)
+    def boo(user_id):
+        called.append(user_id)
+        return 'user-{}'.format(user_id)
+
+    offloader(foo, [1], (), {}, True)
+    offloader(foo, [2, 3, 4, 1], (), {}, True)
+    assert [sorted(it[3][1]) for it in offloader.queue] == [[4], [1, 2, 3]]
+
+    offloader(boo, 'user:10', (10,), {})
+    offloader.run()
+    time.sleep(0.05)
+    # the single key is not blocked by a batch waiting for its window
+    assert called == [[1, 2, 3], 10]
+
+
+def test_offload_legacy_envelope(monkeypatch):
+    monkeypatch.setattr(offload, 'time', lambda: 20)
+    c1 = Cache()
+    c2 = Cache()
+    offloads = []
+    cache = offload.make_offload_cache(
+        c1, c2, fmt='unicode', fuzzy_ttl=False,
+        offload=lambda cache, key, args, kwargs, multi=False: offloads.append(key))
+
+    @cache('user:{}')
+    def get_user(user_id):  # pragma: no cover
+        return u'new'
+
+    @cache.objects('user:{}')
+    def get_users(ids):  # pragma: no cover
+        return {}
+
+    c2.set('user:1', b'25:user-1', 10)
+    c2.set('user:2', b'10:user-2', 10)
+    c2.set('user:3', pack(b'user-3', 10), 10)
+    assert get_user(1) == 'user-1'
+    assert get_users([2, 3]) == {2: 'user-2', 3: 'user-3'}
+    assert offloads == [[2, 3]]
+    assert get_user.get(2) == 'user-2'
+
+
+def test_offload_legacy_format_writes(monkeypatch):
+    monkeypatch.setattr(offload, 'time', lambda: 20)
+    c2 = Cache()
+    cache = offload.make_offload_cache(Cache(), c2, fmt='unicode', legacy_format=True)
+
+    @cache('user:{}', 5, 10, fuzzy_ttl=False)
+    def get_user(user_id):
+        return u'user-{}'.format(user_id)
+
+    assert get_user(1) == 'user-1'
+    assert c2.cache['user:1'] == (b'25:user-1', 10)
+    assert get_user.get(1) == 'user-1'
+
+
+def test_sync_wrappers_are_importable():
+    from cachel.offload import OffloadCacheWrapper, OffloadObjectsCacheWrapper
+    assert issubclass(OffloadObjectsCacheWrapper, OffloadCacheWrapper)
+    assert issubclass(OffloadCacheWrapper, offload.BaseOffloadCacheWrapper)
+
+    cache = offload.make_offload_cache(Cache(), Cache())
+    assert type(cache('user:{}')(lambda user_id: None)) is OffloadCacheWrapper
@@ -18,6 +18,11 @@ def test_redis():
     assert c.client.ttl('key1') == 20
     assert c.client.ttl('key2') == 20
 
+    c.mset_ttl([('key1', 'value3', 30), ('key2', 'value4', 40)])
+    assert c.mget(['key1', 'key2']) == [b'value3', b'value4']
+    assert c.client.ttl('key1') == 30
+    assert c.client.ttl('key2') == 40
+
     c.delete('key1')
     assert c.get('key1') is None
 
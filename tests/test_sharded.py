@@ -0,0 +1,38 @@
+from cachel.sharded import ShardedCache, jump_hash, key_hash
+from .helpers import Cache
+
+
+def test_jump_hash():
+    keys = [key_hash('key:{}'.format(it)) for it in range(1000)]
+    b4 = [jump_hash(it, 4) for it in keys]
+    b5 = [jump_hash(it, 5) for it in keys]
+
+    assert set(b4) == set(range(4))
+    moved = [(a, b) for a, b in zip(b4, b5) if a != b]
+    assert all(b == 4 for _, b in moved)
+    assert 100 < len(moved) < 300
+    assert jump_hash(key_hash(b'key:1'), 4) == b4[1]
+
+
+def test_sharded_cache():
+    caches = [Cache() for _ in range(3)]
+    c = ShardedCache(caches)
+    keys = ['key:{}'.format(it) for it in range(30)]
+
+    c.mset([(k, k.encode()) for k in keys], 10)
+    assert all(cache.cache for cache in caches)
+    assert sum(len(cache.cache) for cache in caches) == 30
+    assert c.mget(keys[::-1] + ['boo']) == [k.encode() for k in keys[::-1]] + [None]
+
+    c.mset_ttl([('key:1', b'foo', 20)])
+    assert c.get('key:1') == b'foo'
+    assert c.get_shard('key:1').cache['key:1'] == (b'foo', 20)
+
+    c.set('key:2', b'bar', 10)
+    assert c.mget(['key:2']) == [b'bar']
+
+    c.delete('key:2')
+    assert c.get('key:2') is None
+
+    c.mdelete(keys)
+    assert not any(cache.cache for cache in caches)
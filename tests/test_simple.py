@@ -1,6 +1,12 @@
+import time
+from threading import Thread
+
 import pytest
 from cachel import expire
+from cachel.base import TOMBSTONE, get_serializer
+from cachel.envelope import pack, unpack
 from cachel.simple import make_cache
+from cachel.offload import ThreadOffloader
 from .helpers import Cache
 
 
@@ -101,3 +107,264 @@ def test_make_cache_objects_custom_expire():
     assert result == {1: 'boo', 2: 'foo'}
     assert get_users.cache.cache == {'user:1': (b'boo', 42),
                                      'user:2': (b'foo', 100)}
+
+
+def test_make_cache_single_flight():
+    cache = make_cache(Cache(), ttl=42, fuzzy_ttl=False, fmt='unicode',
+                       single_flight=True)
+    called = []
+
+    @cache('user:{}')
+    def get_user(user_id):
+        called.append(user_id)
+        time.sleep(0.05)
+        return u'user-{}'.format(user_id)
+
+    @cache.objects('user:{}')
+    def get_users(ids):
+        called.append(sorted(ids))
+        time.sleep(0.05)
+        return {r: u'user-{}'.format(r) for r in ids}
+
+    results = []
+    threads = [Thread(target=lambda: results.append(get_user(10)))
+               for _ in range(5)]
+    threads += [Thread(target=lambda: results.append(get_users([1, 2])))
+                for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert called == [10, [1, 2]]
+    assert results.count('user-10') == 5
+    assert results.count({1: 'user-1', 2: 'user-2'}) == 5
+    assert get_users.cache.cache['user:2'] == (b'user-2', 42)
+
+
+def test_make_cache_objects_mset_ttl():
+    class MsetCache(Cache):
+        def __init__(self):
+            Cache.__init__(self)
+            self.calls = []
+
+        def mset(self, items, ttl):
+            self.calls.append('mset')
+            Cache.mset(self, items, ttl)
+
+        def mset_ttl(self, items):
+            self.calls.append('mset_ttl')
+            for k, v, ttl in items:
+                self.set(k, v, ttl)
+
+    def get_users(ids):
+        return {1: 'boo', 2: expire('foo', 100), 3: expire('bar', 10)}
+
+    c = MsetCache()
+    cached = make_cache(c, ttl=42, fuzzy_ttl=False, fmt='unicode').objects('user:{}')(get_users)
+    assert cached([1, 2, 3]) == {1: 'boo', 2: 'foo', 3: 'bar'}
+    assert c.calls == ['mset_ttl']
+    assert c.cache == {'user:1': (b'boo', 42), 'user:2': (b'foo', 100),
+                       'user:3': (b'bar', 10)}
+
+    c = MsetCache()
+    c.mset_ttl = None
+    cached = make_cache(c, ttl=42, fuzzy_ttl=False, fmt='unicode').objects('user:{}')(get_users)
+    assert cached([1, 2, 3]) == {1: 'boo', 2: 'foo', 3: 'bar'}
+    assert c.calls == ['mset'] * 3
+
+    # default mset_ttl keeps batching for backends with mset only
+    c = MsetCache()
+    del MsetCache.mset_ttl
+    cached = make_cache(c, ttl=42, fuzzy_ttl=False, fmt='unicode').objects('user:{}')(get_users)
+    assert cached([1, 2, 3]) == {1: 'boo', 2: 'foo', 3: 'bar'}
+    assert c.calls == ['mset'] * 3
+
+
+def test_make_cache_objects_negative_ttl():
+    cache = make_cache(Cache(), ttl=42, fuzzy_ttl=False, fmt='unicode', negative_ttl=5)
+    called = []
+
+    @cache.objects('user:{}')
+    def get_users(ids):
+        called.append(sorted(ids))
+        return {r: u'user-{}'.format(r) for r in ids if r != 3}
+
+    assert get_users([1, 3]) == {1: 'user-1'}
+    assert get_users.cache.cache == {'user:1': (b'user-1', 42),
+                                     'user:3': (TOMBSTONE, 5)}
+
+    assert get_users([1, 2, 3]) == {1: 'user-1', 2: 'user-2'}
+    assert get_users.one(3, _default='None') == 'None'
+    assert called == [[1, 3], [2]]
+
+    c = Cache()
+    c.mset_ttl = None
+    cache = make_cache(c, ttl=42, fuzzy_ttl=False, fmt='unicode')
+
+    @cache.objects('user:{}', negative_ttl=5)
+    def get_users(ids):
+        return {}
+
+    assert get_users([1]) == {}
+    assert c.cache == {'user:1': (TOMBSTONE, 5)}
+
+
+def test_make_cache_early_refresh():
+    cache = make_cache(Cache(), ttl=42, fuzzy_ttl=False, fmt='unicode', early_refresh=1)
+    called = [0]
+
+    @cache('user:{}')
+    def get_user(user_id):
+        called[0] += 1
+        time.sleep(0.001)
+        return u'user-{}'.format(user_id)
+
+    assert get_user(10) == 'user-10'
+    data, ttl = get_user.cache.cache['user:10']
+    expire_at, delta, value = unpack(data)
+    assert ttl == 42
+    assert value == b'user-10'
+    assert delta > 0
+    assert expire_at - time.time() > 40
+
+    assert get_user(10) == 'user-10'
+    assert called == [1]
+
+    get_user.beta = 1e12
+    assert get_user(10) == 'user-10'
+    assert called == [2]
+
+    get_user.set(u'boo', 10)
+    assert get_user.get(10) == 'boo'
+    assert get_user.get(20) is None
+
+    # plain values from before early_refresh was enabled are misses
+    get_user.cache.set('user:30', b'legacy-user-30-value', 42)
+    assert get_user.get(30) is None
+    assert get_user(30) == 'user-30'
+    assert called == [3]
+
+    @cache('user:{}', early_refresh=1e12, single_flight=True)
+    def get_user(user_id):
+        called[0] += 1
+        return expire(u'user-{}'.format(user_id), 10)
+
+    assert get_user(20) == 'user-20'
+    assert get_user.cache.cache['user:20'][1] == 10
+
+
+def test_make_cache_early_refresh_compressed_legacy_values():
+    cache = make_cache(Cache(), ttl=42, fuzzy_ttl=False, fmt='msgpack+zlib', early_refresh=1)
+    get_user = cache('user:{}')(lambda user_id: u'user-{}'.format(user_id))
+    dumps = get_serializer('msgpack+zlib')[0]
+    cache.cache.set('user:1', dumps(u'legacy' * 1000), 42)
+    assert get_user.get(1) is None
+    assert get_user(1) == 'user-1'
+
+
+def test_make_cache_max_key_size():
+    cache = make_cache(Cache(), fuzzy_ttl=False, fmt='unicode', max_key_size=40)
+
+    @cache('user:{}')
+    def get_user(user_id):
+        return u'user-{}'.format(user_id)
+
+    @cache.objects('user:{}', max_key_size=50)
+    def get_users(ids):
+        return {it: u'user-{}'.format(it) for it in ids}
+
+    long_id = 'x' * 100
+    assert get_user(long_id) == 'user-' + long_id
+    assert get_users([1, long_id]) == {1: 'user-1', long_id: 'user-' + long_id}
+    assert sorted(len(k) for k in cache.cache.cache) == [6, 40, 50]
+
+
+def test_make_cache_key_spec():
+    cache = make_cache(Cache(), fuzzy_ttl=False, fmt='unicode')
+
+    @cache('user:{user_id}:{lang}', key_spec='user_id, lang="en", **kwargs')
+    def get_user(*args, **kwargs):
+        return u'user-{}'.format(args[0])
+
+    @cache.objects('user:{id}:{filters[lang]}')
+    def get_users(ids, filters):
+        return {it: u'user-{}'.format(it) for it in ids}
+
+    assert get_user(10, timeout=1) == 'user-10'
+    assert get_users([20], {'lang': 'ru'}) == {20: 'user-20'}
+    assert sorted(cache.cache.cache) == ['user:10:en', 'user:20:ru']
+
+
+def test_make_cache_stale_ttl():
+    calls = []
+    offloads = []
+    offload = lambda cache, key, args, kwargs, multi=False: offloads.append((key, args))
+    cache = make_cache(Cache(), ttl=10, fuzzy_ttl=False, fmt='unicode',
+                       stale_ttl=50, offload=offload)
+
+    @cache('user:{}')
+    def get_user(user_id):
+        calls.append(user_id)
+        return u'user-{}'.format(user_id)
+
+    assert get_user(1) == 'user-1'
+    data, ttl = cache.cache.cache['user:1']
+    expire_at, _, value = unpack(data)
+    assert ttl == 60
+    assert value == b'user-1'
+    assert 9 < expire_at - time.time() <= 10
+
+    cache.cache.set('user:1', pack(b'old', time.time() - 1), 60)
+    assert get_user(1) == 'old'
+    assert get_user(1) == 'old'
+    assert offloads == [('user:1', (1,))]
+    assert calls == [1]
+
+    assert get_user.refresh('user:1', (1,), {}) == 'user-1'
+    assert get_user(1) == 'user-1'
+    assert get_user.refreshing == {}
+
+    get_user.set(u'boo', 2)
+    assert get_user.get(2) == 'boo'
+    assert cache.cache.cache['user:2'][1] == 60
+
+    # plain values from before stale_ttl was enabled are misses
+    cache.cache.set('user:3', b'legacy', 60)
+    assert get_user.get(3) is None
+    assert get_user(3) == 'user-3'
+    assert calls == [1, 1, 3]
+
+    cache = make_cache(Cache(), fuzzy_ttl=False, fmt='unicode', stale_ttl=50)
+    get_user = cache('user:{}')(get_user.func)
+    cache.cache.set('user:1', pack(b'old', time.time() - 1), 60)
+    assert get_user(1) == 'old'
+    assert isinstance(get_user.offload, ThreadOffloader)
+    for _ in range(1000):
+        if get_user.offload.stats()['processed']:
+            break
+        time.sleep(0.001)
+    assert get_user(1) == 'user-1'
+
+    with pytest.raises(Exception):
+        cache('user:{}', early_refresh=1)(get_user.func)
+
+
+def test_make_cache_stale_ttl_lost_refreshes():
+    noop = lambda cache, key, args, kwargs, multi=False: None
+    cache = make_cache(Cache(), ttl=10, fuzzy_ttl=False, fmt='unicode',
+                       stale_ttl=50, offload=noop)
+    get_user = cache('user:{}')(lambda user_id: u'user-{}'.format(user_id))
+    get_user.max_refreshing = 100
+
+    for it in range(1000):
+        cache.cache.set('user:{}'.format(it), pack(b'old', time.time() - 1), 60)
+        assert get_user(it) == 'old'
+    assert len(get_user.refreshing) <= 100
+    assert 'user:999' in get_user.refreshing
+
+    # expired marks are purged first
+    now = time.time() + 20
+    get_user.refreshing.update(('k{}'.format(it), now - 1) for it in range(100))
+    assert get_user.start_refresh('user:1', now)
+    assert get_user.refreshing == {'user:1': now + 10}
@@ -0,0 +1,120 @@
+from threading import Thread
+
+from cachel import offload, stats
+from cachel.simple import make_cache
+from .helpers import Cache
+
+
+def test_make_cache_stats():
+    cache = make_cache(Cache(), ttl=42, fuzzy_ttl=False, fmt='unicode', stats=True)
+
+    @cache('user:{}')
+    def get_user(user_id):
+        return u'user-{}'.format(user_id)
+
+    @cache.objects('user:{}')
+    def get_users(ids):
+        return {r: u'user-{}'.format(r) for r in ids}
+
+    get_user(1)
+    get_user(1)
+    get_users([1, 2, 3])
+    get_users(set([2, 3, 4]))
+    assert get_users.cache.cache['user:4'] == (b'user-4', 42)
+
+    data = get_user.stats.snapshot()
+    assert (data['calls'], data['requests'], data['hits'], data['misses']) == (2, 2, 1, 1)
+    assert data['timers']['func']['count'] == 1
+    assert data['timers']['backend']['count'] == 3
+    assert data['timers']['keyfunc']['count'] == 2
+    assert data['timers']['loads']['count'] == 1
+    assert data['timers']['dumps']['count'] == 1
+
+    data = stats.snapshot()['tests.test_stats.get_users']
+    assert (data['calls'], data['requests'], data['hits'], data['misses']) == (2, 6, 3, 3)
+    assert (data['batch_size_sum'], data['batch_size_max']) == (6, 3)
+    assert data['timers']['func']['total'] > 0
+
+    assert type(get_users).__name__ == 'ObjectsCacheWrapper'
+    assert not hasattr(make_cache(Cache())('user:{}')(lambda user_id: None), 'stats')
+
+
+def test_offload_cache_stats(monkeypatch):
+    c1 = Cache()
+    c2 = Cache()
+    cache = offload.make_offload_cache(c1, c2, fmt='unicode', stats=True)
+
+    @cache.objects('user:{}', 5, 10, fuzzy_ttl=False)
+    def foo(ids):
+        return {r: 'user-{}'.format(r) for r in ids}
+
+    monkeypatch.setattr(offload, 'time', lambda: 20)
+    foo([1, 2])
+    monkeypatch.setattr(offload, 'time', lambda: 26)
+    c1.mdelete(['user:1', 'user:2'])
+    assert foo([1, 2, 3]) == {1: 'user-1', 2: 'user-2', 3: 'user-3'}
+
+    data = foo.stats.snapshot()
+    assert data['requests'] == 5
+    assert data['misses'] == 3
+    assert data['hits'] == 2
+    assert data['stale'] == 2
+    assert data['offloads'] == 1
+    assert data['refreshes'] == 2
+    assert cache.caches[foo.id] is foo
+
+    text = stats.export()
+    assert '# TYPE cachel_hits_total counter' in text
+    assert '# TYPE cachel_batch_size_max gauge' in text
+    assert 'cachel_stale_total{cache="tests.test_stats.foo"} 2' in text
+    assert 'cachel_ops_total{cache="tests.test_stats.foo",op="func"} 3' in text
+
+
+def test_offload_cache_stats_cold_misses():
+    cache = offload.make_offload_cache(Cache(), Cache(), fmt='unicode', stats=True)
+
+    @cache('user:{}', 5, 10, fuzzy_ttl=False)
+    def foo(user_id):
+        return 'user-{}'.format(user_id)
+
+    foo(1)
+    foo(2)
+    foo(3)
+    data = foo.stats.snapshot()
+    assert (data['requests'], data['hits'], data['misses']) == (3, 0, 3)
+    assert data['refreshes'] == 0
+
+
+def test_warm_stats():
+    cache = make_cache(Cache(), fuzzy_ttl=False, fmt='unicode', stats=True)
+
+    @cache.objects('user:{}')
+    def get_users(ids):
+        return {r: u'user-{}'.format(r) for r in ids}
+
+    assert get_users.warm(range(5)) == (5, 5)
+    get_users([1, 2])
+    data = get_users.stats.snapshot()
+    assert (data['requests'], data['misses'], data['hits']) == (7, 5, 2)
+
+
+def test_stats_threads():
+    cache = make_cache(Cache(), fuzzy_ttl=False, fmt='unicode', stats=True)
+
+    @cache.objects('user:{}')
+    def get_users(ids):
+        return {r: u'user-{}'.format(r) for r in ids}
+
+    def worker():
+        for _ in range(500):
+            get_users([1, 2])
+
+    threads = [Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    data = get_users.stats.snapshot()
+    assert (data['calls'], data['requests']) == (4000, 8000)
+    assert (data['batch_size_sum'], data['batch_size_max']) == (8000, 2)
@@ -0,0 +1,77 @@
+from cachel.simple import make_cache
+from cachel.memory import MemoryCache
+from cachel.tiered import TieredCache
+from .helpers import Cache
+
+
+def test_tiered_cache():
+    l1 = Cache()
+    l2 = Cache()
+    c = TieredCache(l1, l2, l1_ttl=5)
+
+    c.set('key1', b'value1', 10)
+    assert l1.cache == {'key1': (b'value1', 5)}
+    assert l2.cache == {'key1': (b'value1', 10)}
+
+    l1.cache.clear()
+    assert c.get('key1') == b'value1'
+    assert l1.cache == {'key1': (b'value1', 5)}
+    assert c.get('key2') is None
+
+    c.mset([('key2', b'value2')], 3)
+    assert l1.cache['key2'] == (b'value2', 3)
+
+    c.mset_ttl([('key3', b'value3', 0), ('key4', b'value4', 20)])
+    assert l1.cache['key3'] == (b'value3', 5)
+    assert l2.cache['key4'] == (b'value4', 20)
+
+    l1.cache.clear()
+    l2.set('key1', b'boo', 10)
+    c.set('key2', b'value2', 10)
+    assert c.mget(['key1', 'key2', 'key5']) == [b'boo', b'value2', None]
+    assert l1.cache['key1'] == (b'boo', 5)
+
+    c.delete('key1')
+    assert c.get('key1') is None
+
+    c.mdelete(['key2', 'key3', 'key4'])
+    assert not l1.cache
+    assert not l2.cache
+
+
+def test_tiered_cache_with_make_cache():
+    l2 = Cache()
+    c = TieredCache(None, l2, l1_size=100)
+    assert isinstance(c.l1, MemoryCache)
+    assert c.l1.max_items == 100
+
+    cache = make_cache(c, ttl=42, fuzzy_ttl=False, fmt='unicode')
+    called = [0]
+
+    @cache.objects('user:{}')
+    def get_users(ids):
+        called[0] += 1
+        return {r: u'user-{}'.format(r) for r in ids}
+
+    assert get_users([1, 2]) == {1: 'user-1', 2: 'user-2'}
+    l2.cache.clear()
+    assert get_users([1, 2]) == {1: 'user-1', 2: 'user-2'}
+    assert called == [1]
+
+
+def test_tiered_cache_mset_ttl_groups_by_ttl():
+    class MsetCache(Cache):
+        def __init__(self):
+            Cache.__init__(self)
+            self.calls = []
+
+        def mset(self, items, ttl):
+            items = list(items)
+            self.calls.append((ttl, [it[0] for it in items]))
+            Cache.mset(self, items, ttl)
+
+    l2 = MsetCache()
+    c = TieredCache(None, l2)
+    c.mset_ttl([('key1', b'1', 10), ('key2', b'2', 20), ('key3', b'3', 10)])
+    assert sorted(l2.calls) == [(10, ['key1', 'key3']), (20, ['key2'])]
+    assert c.get('key2') == b'2'
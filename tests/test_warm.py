@@ -0,0 +1,94 @@
+from threading import Thread, Event
+
+from cachel import offload
+from cachel.simple import make_cache
+from .helpers import Cache
+
+
+def test_objects_warm():
+    c = Cache()
+    cache = make_cache(c, fmt='unicode', fuzzy_ttl=False)
+    called = []
+
+    @cache.objects('user:{}', ttl=10)
+    def users(ids):
+        called.append(sorted(ids))
+        return {it: 'user-{}'.format(it) for it in ids if it != 3}
+
+    users.one(2)
+    called[:] = []
+
+    progress = []
+    result = users.warm((it for it in range(1, 6)), chunk_size=2,
+                        progress=lambda *args: progress.append(args))
+    assert result == (5, 4)
+    assert called == [[1], [3, 4], [5]]
+    assert progress == [(2, 1), (4, 3), (5, 4)]
+    assert c.cache['user:4'] == (b'user-4', 10)
+
+    called[:] = []
+    assert users.warm(range(1, 6), chunk_size=2) == (5, 1)
+    assert called == [[3]]
+
+
+def test_objects_warm_concurrency():
+    c = Cache()
+    cache = make_cache(c, fmt='unicode', fuzzy_ttl=False)
+
+    @cache.objects('user:{}', ttl=10)
+    def users(ids):
+        return {it: 'user-{}'.format(it) for it in ids}
+
+    progress = []
+    result = users.warm(range(10), chunk_size=3, concurrency=2,
+                        progress=lambda *args: progress.append(args))
+    assert result == (10, 10)
+    assert progress == [(3, 3), (6, 6), (9, 9), (10, 10)]
+    assert len(c.cache) == 10
+
+
+def test_offload_objects_warm(monkeypatch):
+    c1 = Cache()
+    c2 = Cache()
+    cache = offload.make_offload_cache(c1, c2, fmt='unicode')
+    called = []
+
+    @cache.objects('user:{}', 5, 10, fuzzy_ttl=False)
+    def users(ids):
+        called.append(sorted(ids))
+        return {it: 'user-{}'.format(it) for it in ids}
+
+    monkeypatch.setattr(offload, 'time', lambda: 20)
+    users.one(1)
+    called[:] = []
+
+    assert users.warm(iter([1, 2, 3]), chunk_size=2) == (3, 2)
+    assert called == [[2], [3]]
+    assert sorted(c1.cache) == ['user:1', 'user:2', 'user:3']
+    assert sorted(c2.cache) == ['user:1', 'user:2', 'user:3']
+
+
+def test_objects_warm_single_flight():
+    c = Cache()
+    cache = make_cache(c, fmt='unicode', fuzzy_ttl=False, single_flight=True)
+    started = Event()
+    release = Event()
+    called = []
+
+    @cache.objects('user:{}', ttl=10)
+    def users(ids):
+        called.append(sorted(ids))
+        if len(called) == 1:
+            started.set()
+            release.wait(5)
+        else:
+            # warm owns only the ids which are not in flight
+            release.set()
+        return {it: 'user-{}'.format(it) for it in ids}
+
+    live = Thread(target=users, args=([2, 3],))
+    live.start()
+    started.wait(5)
+    assert users.warm([1, 2, 3]) == (3, 3)
+    live.join(5)
+    assert called == [[2, 3], [1]]